@@ -0,0 +1,139 @@
+"""
+Database engine profile benchmark.
+
+Runs the same mixed workload (transaction inserts from many threads while
+other threads read the user total) against a scratch SQLite file for
+each engine profile and reports writes/sec, read latency, lock errors and
+pool checkout timeouts (readers can starve writers on a small pool).
+
+    cd backend
+    python -m benchmarks.db_profiles --threads 16 --writes 200
+    python -m benchmarks.db_profiles --profile legacy --profile web
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_profile(profile: str, threads: int, writes: int, readers: int) -> dict:
+    from sqlalchemy import func
+    from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout
+    from sqlalchemy.orm import sessionmaker
+    from src import models
+    from src.db_profiles import build_engine, describe_engine
+
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    engine = build_engine(f"sqlite:///{path}", profile)
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        user = models.User(email="bench@example.com", hashed_password="x", name="Bench")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    lock_errors = 0
+    pool_timeouts = 0
+    other_errors = 0
+    counter_lock = threading.Lock()
+    read_latencies = []
+    done = threading.Event()
+
+    def write(index: int) -> None:
+        nonlocal lock_errors, pool_timeouts, other_errors
+        try:
+            with Session() as db:
+                db.add(models.Transaction(
+                    user_id=user_id,
+                    description="bench",
+                    amount=10 + index % 7,
+                    type="expense",
+                    category="food",
+                    date=datetime(2025, 1, 1) + timedelta(days=index % 365)
+                ))
+                db.commit()
+        except OperationalError:
+            with counter_lock:
+                lock_errors += 1
+        except PoolTimeout:
+            with counter_lock:
+                pool_timeouts += 1
+        except Exception:
+            with counter_lock:
+                other_errors += 1
+
+    def read() -> None:
+        nonlocal other_errors
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    db.query(func.sum(models.Transaction.amount)).filter(
+                        models.Transaction.user_id == user_id
+                    ).scalar()
+            except Exception:
+                with counter_lock:
+                    other_errors += 1
+                continue
+            with counter_lock:
+                read_latencies.append((time.perf_counter() - started) * 1000)
+
+    reader_threads = [threading.Thread(target=read, daemon=True) for _ in range(readers)]
+    for thread in reader_threads:
+        thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(write, range(writes)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    settings = describe_engine(engine)
+    engine.dispose()
+    return {
+        "profile": profile,
+        "journal_mode": settings.get("journal_mode"),
+        "synchronous": settings.get("synchronous"),
+        "pool": settings["pool"],
+        "writes": writes,
+        "writes_per_sec": round(writes / elapsed, 1),
+        "lock_errors": lock_errors,
+        "pool_timeouts": pool_timeouts,
+        "other_errors": other_errors,
+        "reads": len(read_latencies),
+        "read_p50_ms": round(_percentile(read_latencies, 50), 2),
+        "read_p99_ms": round(_percentile(read_latencies, 99), 2),
+        "read_mean_ms": round(statistics.mean(read_latencies), 2) if read_latencies else 0.0
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="append", dest="profiles", help="profiles to compare (default: all)")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src.db_profiles import ENGINE_PROFILES
+
+    for profile in args.profiles or list(ENGINE_PROFILES):
+        print(json.dumps(run_profile(profile, args.threads, args.writes, args.readers)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
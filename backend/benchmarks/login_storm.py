@@ -0,0 +1,108 @@
+"""
+Login storm benchmark.
+
+Starts the API on a scratch SQLite database, fires concurrent logins and
+measures logins/sec together with the latency of an unrelated authenticated
+GET endpoint while the storm runs.
+
+    cd backend
+    python -m benchmarks.login_storm --logins 200 --concurrency 32
+    PASSWORD_HASH_EXECUTOR=process python -m benchmarks.login_storm
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _request(url: str, data: bytes = None, headers: dict = None) -> int:
+    request = urllib.request.Request(url, data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-path", default="/api/budgets")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import uvicorn
+    from src.main import app
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    credentials = {"email": "bench@example.com", "name": "Bench", "password": "bench-password"}
+    _request(base + "/api/auth/register", json.dumps(credentials).encode(), {"Content-Type": "application/json"})
+    form = urllib.parse.urlencode({"username": credentials["email"], "password": credentials["password"]}).encode()
+    with urllib.request.urlopen(urllib.request.Request(base + "/api/auth/login", data=form)) as response:
+        token = json.loads(response.read())["access_token"]
+    probe_headers = {"Authorization": f"Bearer {token}"}
+
+    probe_latencies = []
+    probe_errors = []
+    storm_done = threading.Event()
+
+    def probe():
+        while not storm_done.is_set():
+            started = time.perf_counter()
+            if _request(base + args.probe_path, headers=probe_headers) != 200:
+                probe_errors.append(1)
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    def login(_):
+        return _request(base + "/api/auth/login", form, {"Content-Type": "application/x-www-form-urlencoded"})
+
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    probe_thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        statuses = list(pool.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - started
+    storm_done.set()
+    probe_thread.join()
+    server.should_exit = True
+
+    ok = sum(1 for code in statuses if code == 200)
+    print(f"executor={os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')} logins={args.logins} concurrency={args.concurrency}")
+    print(f"logins/sec: {ok / elapsed:.1f} ({ok} ok, {statuses.count(503)} rejected, {elapsed:.2f}s)")
+    print(
+        f"{args.probe_path} during storm: n={len(probe_latencies)} "
+        f"p50={statistics.median(probe_latencies) if probe_latencies else 0:.1f}ms "
+        f"p99={_percentile(probe_latencies, 99):.1f}ms errors={len(probe_errors)}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
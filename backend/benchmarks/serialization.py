@@ -0,0 +1,81 @@
+"""
+List endpoint serialization benchmark.
+
+Seeds a scratch database through the import endpoint, then fetches the same
+1000-row pages of /api/transactions (plus /api/budgets and /api/holidays)
+with FAST_JSON_RESPONSES off and on. It reports rows/sec for each path and
+checks that both paths return byte-identical bodies.
+
+    cd backend
+    python -m benchmarks.serialization --rows 20000 --rounds 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fastapi.testclient import TestClient
+    from src import fast_json
+    from src.core.config import settings
+    from src.main import app
+
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "name": "Bench", "password": "benchmark-pw"}
+        client.post("/api/auth/register", json=credentials)
+        token = client.post(
+            "/api/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        lines = ["date,description,amount,category,type"]
+        for index in range(args.rows):
+            lines.append(
+                f"2025-{1 + index % 12:02d}-{1 + index % 28:02d}T{index % 24:02d}:00:00,"
+                f"\"Café purchase #{index}\",{(index % 500) / 7:.6f},"
+                f"{['Food', 'Housing', 'Shopping'][index % 3]},{'income' if index % 9 == 0 else 'expense'}"
+            )
+        client.post(
+            "/api/transactions/import",
+            content="\n".join(lines).encode(),
+            headers={**headers, "Content-Type": "text/csv"}
+        )
+        for category in ("Food", "Housing", "Shopping"):
+            client.post("/api/budgets", json={"category": category, "amount": 500, "period": "monthly"}, headers=headers)
+
+        requests = [
+            ("/api/transactions", {"limit": args.limit}),
+            ("/api/budgets", {}),
+            ("/api/holidays", {"from": "2025-01-01", "to": "2025-12-31"}),
+        ]
+        print(f"encoder: {'orjson' if fast_json.orjson is not None else 'json (orjson not installed)'}")
+        for path, params in requests:
+            bodies = {}
+            for fast in (False, True):
+                settings.FAST_JSON_RESPONSES = fast
+                client.get(path, params=params, headers=headers)
+                started = time.perf_counter()
+                for _ in range(args.rounds):
+                    response = client.get(path, params=params, headers=headers)
+                    bodies[fast] = response.content
+                elapsed = time.perf_counter() - started
+                count = len(response.json())
+                print(
+                    f"{path:<20} {'fast' if fast else 'orm ':<5} rows/page={count:<5} "
+                    f"rows/sec={count * args.rounds / elapsed:>10.0f} ms/page={elapsed / args.rounds * 1000:.2f}"
+                )
+            print(f"{path:<20} identical bodies: {bodies[False] == bodies[True]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import make_url
+
+from . import models
+from .database import SessionLocal, engine
+from .db_migrations import MIGRATIONS, ensure_schema
+from .holiday_seed import holiday_data_path, seed_holidays_missing
+from .rollups import ensure_rollups_populated
+
+logger = logging.getLogger(__name__)
+
+# Every schema change ships as a migration, so the newest one identifies the schema
+SCHEMA_VERSION = MIGRATIONS[-1].version
+STAMP_KEY = "bootstrap"
+
+def _seed_fingerprint() -> str:
+    with open(holiday_data_path(), "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()[:16]
+
+def expected_stamp() -> str:
+    # Keyed "migrations=" rather than the old hand-bumped "schema=" counter, so
+    # stamps written under that scheme can never match by accident
+    return f"migrations={SCHEMA_VERSION};seed={_seed_fingerprint()}"
+
+def _read_stamp() -> Optional[str]:
+    try:
+        with SessionLocal() as db:
+            return db.query(models.AppStamp.value).filter(models.AppStamp.key == STAMP_KEY).scalar()
+    except SQLAlchemyError:
+        # The stamp table does not exist yet on a brand new database
+        return None
+
+def _write_stamp(value: str) -> None:
+    with SessionLocal() as db:
+        stamp = db.query(models.AppStamp).filter(models.AppStamp.key == STAMP_KEY).first()
+        if stamp is None:
+            stamp = models.AppStamp(key=STAMP_KEY)
+            db.add(stamp)
+        stamp.value = value
+        stamp.updated_at = datetime.utcnow()
+        db.commit()
+
+def _lock_path() -> str:
+    url = make_url(str(engine.url))
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        return os.path.abspath(url.database) + ".bootstrap.lock"
+    return os.path.join(tempfile.gettempdir(), "expense-tracker-bootstrap.lock")
+
+@contextmanager
+def bootstrap_lock(path: Optional[str] = None) -> Iterator[None]:
+    """
+    Exclusive cross-process lock so only one worker migrates or seeds at a time
+    """
+    handle = open(path or _lock_path(), "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        handle.close()
+
+def bootstrap_database() -> bool:
+    """
+    Create/migrate the schema and seed reference data unless the stored stamp
+    is already current. Returns True when work was done.
+    """
+    started = time.perf_counter()
+    target = expected_stamp()
+    if _read_stamp() == target:
+        logger.info("Database bootstrap skipped (stamp current) in %.1f ms", (time.perf_counter() - started) * 1000)
+        return False
+
+    with bootstrap_lock():
+        # Another worker may have finished while we waited for the lock
+        if _read_stamp() == target:
+            logger.info("Database bootstrap completed by another worker; waited %.1f ms", (time.perf_counter() - started) * 1000)
+            return False
+        models.Base.metadata.create_all(bind=engine)
+        ensure_schema()
+        with SessionLocal() as db:
+            seeded = seed_holidays_missing(db)
+            ensure_rollups_populated(db)
+        _write_stamp(target)
+
+    logger.info(
+        "Database bootstrap migrated and seeded %s holidays in %.1f ms",
+        seeded,
+        (time.perf_counter() - started) * 1000
+    )
+    return True
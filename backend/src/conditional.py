@@ -0,0 +1,40 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Browsers must revalidate, but may keep the body and reuse it on a 304
+CACHE_CONTROL = "private, no-cache"
+
+def _representation_key(request: Request) -> str:
+    # Gzipped and identity bodies are different representations, so their strong tags differ
+    gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    return f"{request.url.path}?{sorted(request.query_params.multi_items())}|gzip={gzip}"
+
+def user_etag(request: Request, user_id: int, data_version: Optional[int]) -> str:
+    """
+    Strong ETag for a per-user resource: changes whenever the user's data
+    version is bumped or the request asks for a different slice
+    """
+    digest = hashlib.sha256(_representation_key(request).encode()).hexdigest()[:16]
+    return f'"u{user_id}-v{data_version or 0}-{digest}"'
+
+def content_etag(request: Request, content: Any) -> str:
+    """
+    Strong ETag derived from the data itself, for resources without a version
+    """
+    digest = hashlib.sha256(f"{_representation_key(request)}|{content!r}".encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -1,15 +1,64 @@
 import os
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+def _sqlite_pragma_overrides() -> Dict[str, str]:
+    pragmas = ("journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store", "busy_timeout")
+    return {pragma: os.getenv(f"SQLITE_{pragma.upper()}") for pragma in pragmas if os.getenv(f"SQLITE_{pragma.upper()}")}
+
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./expense_tracker.db")
+    DATABASE_READ_URL: Optional[str] = os.getenv("DATABASE_READ_URL") or None
+    DB_PROFILE: str = os.getenv("DB_PROFILE", "web")
+    DB_POOL_SIZE: Optional[int] = _optional_int("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: Optional[int] = _optional_int("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    SQLITE_PRAGMA_OVERRIDES: Dict[str, str] = _sqlite_pragma_overrides()
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    # A token rotated this recently is treated as a concurrent refresh, not reuse
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = int(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "5"))
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
     HOLIDAY_API_PROVIDER: str = os.getenv("HOLIDAY_API_PROVIDER", "calendarific")
     CALENDARIFIC_API_KEY: str = os.getenv("CALENDARIFIC_API_KEY", "")
+    CALENDARIFIC_BASE_URL: str = os.getenv("CALENDARIFIC_BASE_URL", "https://calendarific.com/api/v2")
+    # Covers every provider fetch made by the app: the periodic prefetch and the
+    # on-demand fetches queued by holiday reads (the sync CLI is unaffected)
+    HOLIDAY_SYNC_ENABLED: bool = os.getenv("HOLIDAY_SYNC_ENABLED", "true").lower() == "true"
+    HOLIDAY_SYNC_WORKERS: int = int(os.getenv("HOLIDAY_SYNC_WORKERS", "4"))
+    HOLIDAY_SYNC_INTERVAL_SECONDS: int = int(os.getenv("HOLIDAY_SYNC_INTERVAL_SECONDS", "86400"))
+    HOLIDAY_SYNC_YEARS_BACK: int = int(os.getenv("HOLIDAY_SYNC_YEARS_BACK", "2"))
+    HOLIDAY_FETCH_BACKOFF_SECONDS: int = int(os.getenv("HOLIDAY_FETCH_BACKOFF_SECONDS", "3600"))
+    HOLIDAY_FETCH_BACKOFF_MAX_SECONDS: int = int(os.getenv("HOLIDAY_FETCH_BACKOFF_MAX_SECONDS", "604800"))
+    HOLIDAY_SYNC_YEARS_AHEAD: int = int(os.getenv("HOLIDAY_SYNC_YEARS_AHEAD", "1"))
+    HOLIDAY_CALENDAR_REFRESH_SECONDS: int = int(os.getenv("HOLIDAY_CALENDAR_REFRESH_SECONDS", "3600"))
+    INSIGHT_SCHEDULER_ENABLED: bool = os.getenv("INSIGHT_SCHEDULER_ENABLED", "false").lower() == "true"
+    INSIGHT_SCHEDULER_WORKERS: int = int(os.getenv("INSIGHT_SCHEDULER_WORKERS", "2"))
+    INSIGHT_SCHEDULER_EXECUTOR: str = os.getenv("INSIGHT_SCHEDULER_EXECUTOR", "thread")
+    INSIGHT_SCHEDULER_INTERVAL_SECONDS: int = int(os.getenv("INSIGHT_SCHEDULER_INTERVAL_SECONDS", "900"))
+    INSIGHT_CACHE_TTL_HOURS: int = int(os.getenv("INSIGHT_CACHE_TTL_HOURS", "72"))
+    INSIGHT_WINDOW_DAYS: int = int(os.getenv("INSIGHT_WINDOW_DAYS", "30"))
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", "6"))
+    # Off unless asked for: /metrics exposes route names, SQL timings and auth counters
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    SLOW_REQUEST_LOG_MS: Optional[int] = _optional_int("SLOW_REQUEST_LOG_MS")
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+    IMPORT_MAX_REPORTED_ERRORS: int = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
 
 settings = Settings()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from .config import settings
+from .security import get_password_hash, verify_password
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated bounded executor so hashing bursts cannot occupy
+    the request threadpool. Submissions beyond max_queue are rejected with 503.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE,
+        executor: str = settings.PASSWORD_HASH_EXECUTOR
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.executor == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._pool
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_queue + self.max_workers:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        submitted = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._get_pool().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._wait_seconds += time.perf_counter() - submitted
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": self.executor,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": max(self._pending - self.max_workers, 0),
+                "in_flight": self._pending,
+                "peak_in_flight": self._peak_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_latency_ms": round(self._wait_seconds / self._completed * 1000, 2) if self._completed else 0.0
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+password_hasher = PasswordHasher()
@@ -1,13 +1,22 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, or_, select
 from datetime import datetime, timedelta, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from collections import defaultdict
+import base64
+import binascii
 import json
 
-from . import models, schemas
-from .core.security import verify_password, decode_token
+from . import db_upsert, models, schemas, rollups
+from .core.security import verify_password, decode_token, generate_refresh_token, hash_refresh_token
 from .core.config import settings
-from .holiday_provider import fetch_calendarific_holidays
+from .expense_series import ExpenseSeries, merge_ranges
+from .holiday_calendar import CalendarEvent, holiday_calendar
+from .holiday_sync import holiday_sync
+from .user_cache import CachedUser, user_cache
+
+# Approximate per-row storage of the numeric/date columns of holiday_insights
+INSIGHT_ROW_FIXED_BYTES = 96
 
 # User CRUD operations
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
@@ -30,19 +39,35 @@ def create_user(db: Session, user: schemas.UserCreate, hashed_password: str) ->
     db.refresh(db_user)
     return db_user
 
-def get_current_user(token: str, db: Session):
+def get_current_user(token: str, db: Session) -> Optional[CachedUser]:
     """
-    Get the current authenticated user from token
+    Get the current authenticated user from token, served from the identity
+    cache when possible
     """
     payload = decode_token(token)
     email: str = payload.get("sub")
     if email is None:
         return None
-    
-    user = get_user_by_email(db, email=email)
-    return user
 
-def update_user_preferences(db: Session, user: models.User, prefs: schemas.UserPreferencesUpdate) -> models.User:
+    cached = user_cache.get(email)
+    if cached is not None:
+        return cached
+
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if user is not None and user.email != email:
+            user = None
+    else:
+        user = get_user_by_email(db, email=email)
+    if user is None:
+        return None
+    snapshot = CachedUser.from_model(user)
+    user_cache.put(email, snapshot)
+    return snapshot
+
+def update_user_preferences(db: Session, current_user: CachedUser, prefs: schemas.UserPreferencesUpdate) -> models.User:
+    user = db.query(models.User).filter(models.User.id == current_user.id).first()
     if prefs.country_code is not None:
         user.country_code = prefs.country_code
     if prefs.timezone is not None:
@@ -54,18 +79,165 @@ def update_user_preferences(db: Session, user: models.User, prefs: schemas.UserP
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    user_cache.invalidate(user.email)
     return user
 
+# Refresh token operations
+def create_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """
+    Issue a refresh token and store only its keyed hash
+    """
+    token = generate_refresh_token()
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or generate_refresh_token(),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    return token
+
+def revoke_refresh_token_family(db: Session, family_id: str) -> int:
+    revoked = db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at.is_(None)
+    ).update({models.RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return revoked
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[models.User, str]]:
+    """
+    Exchange a refresh token for a new one in the same family. Presenting an
+    already-rotated token revokes the whole family (token reuse), unless it was
+    rotated within REFRESH_TOKEN_REUSE_GRACE_SECONDS: that is a concurrent
+    refresh (e.g. two tabs) losing the race, which just gets None.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.utcnow()
+    # Claim the token with a conditional UPDATE so that of two concurrent
+    # refreshes with the same token only one wins
+    claimed = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == token_hash,
+        models.RefreshToken.revoked_at.is_(None),
+        models.RefreshToken.expires_at > now
+    ).update({models.RefreshToken.revoked_at: now}, synchronize_session=False)
+    record = db.query(models.RefreshToken).filter(models.RefreshToken.token_hash == token_hash).first()
+    if not claimed:
+        db.rollback()
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        if record is not None and record.revoked_at is not None and record.revoked_at < now - grace:
+            revoke_refresh_token_family(db, record.family_id)
+        return None
+
+    user = db.query(models.User).filter(models.User.id == record.user_id).first()
+    if user is None:
+        db.commit()
+        return None
+    return user, create_refresh_token(db, user.id, family_id=record.family_id)
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    record = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == hash_refresh_token(token)
+    ).first()
+    if record is None:
+        return False
+    revoke_refresh_token_family(db, record.family_id)
+    return True
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """
+    Current data version of a user, used to tag cacheable read responses
+    """
+    version = db.query(models.User.data_version).filter(models.User.id == user_id).scalar()
+    return version or 0
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """
+    Mark the user's transactions or budgets as changed; commits with the caller's write
+    """
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.data_version: func.coalesce(models.User.data_version, 0) + 1},
+        synchronize_session=False
+    )
+
+def response_columns(model, response_schema) -> List[Any]:
+    """
+    The model columns behind a response schema, in the schema's field order
+    """
+    return [getattr(model, name) for name in response_schema.__fields__]
+
 # Transaction CRUD operations
-def get_transactions(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Transaction]:
+def encode_transaction_cursor(transaction: models.Transaction) -> str:
+    raw = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_transaction_cursor(cursor: str) -> Tuple[datetime, int]:
     """
-    Get all transactions for a specific user
+    Parse a cursor from encode_transaction_cursor; raises ValueError if malformed
     """
-    return db.query(models.Transaction)\
-        .filter(models.Transaction.user_id == user_id)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (UnicodeDecodeError, binascii.Error) as error:
+        raise ValueError("Invalid cursor") from error
+
+def apply_transaction_filters(query, filters: Optional[schemas.TransactionFilters]):
+    if filters is None:
+        return query
+    if filters.date_from:
+        query = query.filter(models.Transaction.date >= datetime.combine(filters.date_from, datetime.min.time()))
+    if filters.date_to:
+        query = query.filter(models.Transaction.date <= datetime.combine(filters.date_to, datetime.max.time()))
+    if filters.type:
+        query = query.filter(models.Transaction.type == filters.type)
+    if filters.category:
+        query = query.filter(models.Transaction.category == filters.category)
+    if filters.min_amount is not None:
+        query = query.filter(models.Transaction.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.filter(models.Transaction.amount <= filters.max_amount)
+    if filters.search:
+        pattern = filters.search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(models.Transaction.description.ilike(f"%{pattern}%", escape="\\"))
+    return query
+
+def get_transactions(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    filters: Optional[schemas.TransactionFilters] = None,
+    skip: int = 0,
+    as_tuples: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Get one page of a user's transactions, newest first, and the cursor of the
+    next page (None on the last page). Pages are keyset-based on (date, id) so
+    every page is a single index range scan regardless of depth; `skip` is only
+    honoured without a cursor, for older clients. With as_tuples the rows are
+    plain tuples in TransactionResponse field order instead of ORM objects.
+    """
+    entities = response_columns(models.Transaction, schemas.TransactionResponse) if as_tuples else [models.Transaction]
+    query = apply_transaction_filters(
+        db.query(*entities).filter(models.Transaction.user_id == user_id),
+        filters
+    )
+    if cursor:
+        cursor_date, cursor_id = decode_transaction_cursor(cursor)
+        query = query.filter(
+            models.Transaction.date <= cursor_date,
+            or_(
+                models.Transaction.date < cursor_date,
+                models.Transaction.id < cursor_id
+            )
+        )
+    elif skip:
+        query = query.offset(skip)
+    rows = query.order_by(models.Transaction.date.desc(), models.Transaction.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_transaction_cursor(rows[limit - 1])
+    return rows, None
 
 def get_transaction(db: Session, transaction_id: int) -> Optional[models.Transaction]:
     """
@@ -84,6 +256,10 @@ def create_transaction(db: Session, transaction: schemas.TransactionCreate, user
         user_id=user_id
     )
     db.add(db_transaction)
+    rollups.apply_transaction_delta(db, db_transaction, 1)
+    if db_transaction.type == "expense":
+        invalidate_insights_for_days(db, user_id, [db_transaction.date.date()])
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
@@ -94,9 +270,16 @@ def update_transaction(db: Session, transaction_id: int, transaction: schemas.Tr
     """
     db_transaction = get_transaction(db, transaction_id=transaction_id)
     if db_transaction:
+        rollups.apply_transaction_delta(db, db_transaction, -1)
+        affected_days = [db_transaction.date.date()] if db_transaction.type == "expense" else []
         for key, value in transaction.dict().items():
             setattr(db_transaction, key, value)
+        rollups.apply_transaction_delta(db, db_transaction, 1)
+        if db_transaction.type == "expense":
+            affected_days.append(db_transaction.date.date())
+        invalidate_insights_for_days(db, db_transaction.user_id, affected_days)
         db_transaction.updated_at = datetime.utcnow()
+        bump_data_version(db, db_transaction.user_id)
         db.commit()
         db.refresh(db_transaction)
     return db_transaction
@@ -107,15 +290,116 @@ def delete_transaction(db: Session, transaction_id: int):
     """
     db_transaction = get_transaction(db, transaction_id=transaction_id)
     if db_transaction:
+        rollups.apply_transaction_delta(db, db_transaction, -1)
+        if db_transaction.type == "expense":
+            invalidate_insights_for_days(db, db_transaction.user_id, [db_transaction.date.date()])
+        bump_data_version(db, db_transaction.user_id)
         db.delete(db_transaction)
         db.commit()
 
+def _transaction_selection(db: Session, user_id: int, selection: schemas.TransactionBatchSelection):
+    # Ownership is part of the WHERE clause, so foreign ids simply do not match
+    query = db.query(models.Transaction).filter(models.Transaction.user_id == user_id)
+    if selection.ids is not None:
+        query = query.filter(models.Transaction.id.in_(selection.ids))
+    return apply_transaction_filters(query, selection.filters)
+
+def _selection_groups(db: Session, query) -> List[Tuple[str, str, str, float, int]]:
+    month = rollups.month_bucket(db, models.Transaction.date)
+    return query.with_entities(
+        month,
+        models.Transaction.category,
+        models.Transaction.type,
+        func.sum(models.Transaction.amount),
+        func.count(models.Transaction.id)
+    ).group_by(month, models.Transaction.category, models.Transaction.type).all()
+
+def _selection_days(query) -> List[Tuple[date, str]]:
+    return [
+        (row[0].date(), row[1])
+        for row in query.with_entities(models.Transaction.date, models.Transaction.type).distinct().all()
+    ]
+
+def _net_deltas(deltas: Dict[Tuple[str, str, str], List[float]]) -> Dict[Tuple[str, str, str], Tuple[float, int]]:
+    return {
+        key: (amount, int(count))
+        for key, (amount, count) in deltas.items()
+        if count or abs(amount) > 1e-9
+    }
+
+def batch_update_transactions(
+    db: Session,
+    user_id: int,
+    selection: schemas.TransactionBatchUpdate
+) -> int:
+    """
+    Apply the same changes to every selected transaction with one UPDATE and
+    one commit. Rollup deltas are derived from a grouped pre-aggregate of the
+    selection, so the rows themselves are never loaded.
+    """
+    changes = selection.changes.dict(exclude_none=True)
+    query = _transaction_selection(db, user_id, selection)
+    groups = _selection_groups(db, query)
+    if not groups:
+        return 0
+    days = _selection_days(query)
+
+    new_month = rollups.month_key(changes["date"]) if "date" in changes else None
+    deltas: Dict[Tuple[str, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+    for month, category, tx_type, total, count in groups:
+        before = deltas[(month, category, tx_type)]
+        before[0] -= total or 0.0
+        before[1] -= count
+        after = deltas[(new_month or month, changes.get("category", category), changes.get("type", tx_type))]
+        after[0] += changes["amount"] * count if "amount" in changes else total or 0.0
+        after[1] += count
+
+    affected = query.update(
+        {**changes, "updated_at": datetime.utcnow()},
+        synchronize_session=False
+    )
+    rollups.apply_rollup_deltas(db, user_id, _net_deltas(deltas))
+    affected_days = {day for day, tx_type in days if tx_type == "expense"}
+    if "date" in changes:
+        if "type" in changes:
+            now_expense = changes["type"] == "expense"
+        else:
+            now_expense = any(tx_type == "expense" for _, tx_type in days)
+        if now_expense:
+            affected_days.add(changes["date"].date())
+    else:
+        affected_days.update(day for day, tx_type in days if changes.get("type", tx_type) == "expense")
+    invalidate_insights_for_days(db, user_id, sorted(affected_days))
+    bump_data_version(db, user_id)
+    db.commit()
+    return affected
+
+def batch_delete_transactions(db: Session, user_id: int, selection: schemas.TransactionBatchSelection) -> int:
+    """
+    Delete every selected transaction with one DELETE and one commit
+    """
+    query = _transaction_selection(db, user_id, selection)
+    groups = _selection_groups(db, query)
+    if not groups:
+        return 0
+    days = _selection_days(query)
+    affected = query.delete(synchronize_session=False)
+    rollups.apply_rollup_deltas(db, user_id, {
+        (month, category, tx_type): (-(total or 0.0), -count)
+        for month, category, tx_type, total, count in groups
+    })
+    invalidate_insights_for_days(db, user_id, sorted({day for day, tx_type in days if tx_type == "expense"}))
+    bump_data_version(db, user_id)
+    db.commit()
+    return affected
+
 # Budget CRUD operations
-def get_budgets(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Budget]:
+def get_budgets(db: Session, user_id: int, skip: int = 0, limit: int = 100, as_tuples: bool = False) -> List[Any]:
     """
     Get all budgets for a specific user
     """
-    return db.query(models.Budget)\
+    entities = response_columns(models.Budget, schemas.BudgetResponse) if as_tuples else [models.Budget]
+    return db.query(*entities)\
         .filter(models.Budget.user_id == user_id)\
         .offset(skip)\
         .limit(limit)\
@@ -138,6 +422,8 @@ def create_budget(db: Session, budget: schemas.BudgetCreate, user_id: int) -> mo
         user_id=user_id
     )
     db.add(db_budget)
+    invalidate_user_insights(db, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_budget)
     return db_budget
@@ -151,6 +437,8 @@ def update_budget(db: Session, budget_id: int, budget: schemas.BudgetCreate) ->
         for key, value in budget.dict().items():
             setattr(db_budget, key, value)
         db_budget.updated_at = datetime.utcnow()
+        invalidate_user_insights(db, db_budget.user_id)
+        bump_data_version(db, db_budget.user_id)
         db.commit()
         db.refresh(db_budget)
     return db_budget
@@ -161,48 +449,146 @@ def delete_budget(db: Session, budget_id: int):
     """
     db_budget = get_budget(db, budget_id=budget_id)
     if db_budget:
+        invalidate_user_insights(db, db_budget.user_id)
+        bump_data_version(db, db_budget.user_id)
         db.delete(db_budget)
         db.commit()
 
+def batch_update_budgets(db: Session, user_id: int, batch: schemas.BudgetBatchUpdate) -> int:
+    """
+    Apply the same changes to the user's budgets with the given ids in one UPDATE
+    """
+    affected = db.query(models.Budget).filter(
+        models.Budget.user_id == user_id,
+        models.Budget.id.in_(batch.ids)
+    ).update(
+        {**batch.changes.dict(exclude_none=True), "updated_at": datetime.utcnow()},
+        synchronize_session=False
+    )
+    if affected:
+        invalidate_user_insights(db, user_id)
+        bump_data_version(db, user_id)
+    db.commit()
+    return affected
+
+def batch_delete_budgets(db: Session, user_id: int, batch: schemas.BudgetBatchDelete) -> int:
+    """
+    Delete the user's budgets with the given ids in one DELETE
+    """
+    affected = db.query(models.Budget).filter(
+        models.Budget.user_id == user_id,
+        models.Budget.id.in_(batch.ids)
+    ).delete(synchronize_session=False)
+    if affected:
+        invalidate_user_insights(db, user_id)
+        bump_data_version(db, user_id)
+    db.commit()
+    return affected
+
+def get_budget_progress(db: Session, user_id: int, today: Optional[date] = None) -> List[dict]:
+    """
+    Spent, remaining and pace of every budget for its current period. Spend
+    for all categories and all three period kinds comes from one grouped query.
+    """
+    today = today or date.today()
+    budgets = db.query(models.Budget).filter(models.Budget.user_id == user_id).order_by(models.Budget.id).all()
+    if not budgets:
+        return []
+
+    ranges = {period: get_range(today) for period, get_range in BUDGET_PERIOD_RANGES.items()}
+    window_start = min(start for start, _ in ranges.values())
+    window_end = max(end for _, end in ranges.values())
+
+    def _in_period(period: str):
+        start, end = ranges[period]
+        return case(
+            (and_(
+                models.Transaction.date >= datetime.combine(start, datetime.min.time()),
+                models.Transaction.date <= datetime.combine(end, datetime.max.time())
+            ), models.Transaction.amount),
+            else_=0.0
+        )
+
+    periods = list(ranges)
+    rows = db.query(
+        models.Transaction.category,
+        *[func.sum(_in_period(period)) for period in periods]
+    ).filter(
+        models.Transaction.user_id == user_id,
+        models.Transaction.type == "expense",
+        models.Transaction.category.in_({budget.category for budget in budgets}),
+        models.Transaction.date >= datetime.combine(window_start, datetime.min.time()),
+        models.Transaction.date <= datetime.combine(window_end, datetime.max.time())
+    ).group_by(models.Transaction.category).all()
+    spent_by_category = {
+        row[0]: {period: float(row[index + 1] or 0.0) for index, period in enumerate(periods)}
+        for row in rows
+    }
+
+    progress = []
+    for budget in budgets:
+        period = budget.period if budget.period in ranges else "monthly"
+        start, end = ranges[period]
+        spent = spent_by_category.get(budget.category, {}).get(period, 0.0)
+        elapsed = ((today - start).days + 1) / ((end - start).days + 1)
+        projected = spent / elapsed
+        if spent > budget.amount:
+            status = "over"
+        elif projected > budget.amount:
+            status = "at_risk"
+        else:
+            status = "on_track"
+        progress.append({
+            "budget_id": budget.id,
+            "category": budget.category,
+            "period": budget.period,
+            "amount": budget.amount,
+            "period_start": start,
+            "period_end": end,
+            "spent": round(spent, 2),
+            "remaining": round(budget.amount - spent, 2),
+            "pct_used": round(spent / budget.amount * 100, 1) if budget.amount > 0 else 0.0,
+            "pct_elapsed": round(elapsed * 100, 1),
+            "projected_spend": round(projected, 2),
+            "status": status
+        })
+    return progress
+
 # Statistics operations
 def get_transaction_stats(db: Session, user_id: int) -> dict:
     """
-    Get statistics about transactions
+    Get statistics about transactions from the per-month rollup table
     """
-    transactions = get_transactions(db, user_id=user_id)
-    
-    # Calculate totals
+    rows = [
+        (row.type, row.category, row.month, row.total_amount, row.transaction_count)
+        for row in rollups.get_user_rollups(db, user_id)
+    ]
+
     total_income = 0.0
     total_expenses = 0.0
+    transactions_count = 0
     category_breakdown = {}
-    
-    for transaction in transactions:
-        if transaction.type == "income":
-            total_income += transaction.amount
-        else:
-            total_expenses += transaction.amount
-            if transaction.category not in category_breakdown:
-                category_breakdown[transaction.category] = 0.0
-            category_breakdown[transaction.category] += transaction.amount
-    
-    net_income = total_income - total_expenses
-    transactions_count = len(transactions)
-    average_transaction_amount = net_income / transactions_count if transactions_count > 0 else 0.0
-    
-    # Calculate monthly summary
     monthly_summary = {}
-    for transaction in transactions:
-        month_key = transaction.date.strftime("%Y-%m")
+
+    for tx_type, category, month_key, amount, count in rows:
+        amount = float(amount or 0.0)
+        transactions_count += int(count or 0)
         if month_key not in monthly_summary:
             monthly_summary[month_key] = {
                 "income": 0.0,
                 "expenses": 0.0
             }
-        if transaction.type == "income":
-            monthly_summary[month_key]["income"] += transaction.amount
+        if tx_type == "income":
+            total_income += amount
+            monthly_summary[month_key]["income"] += amount
         else:
-            monthly_summary[month_key]["expenses"] += transaction.amount
-    
+            total_expenses += amount
+            monthly_summary[month_key]["expenses"] += amount
+            category_breakdown[category] = category_breakdown.get(category, 0.0) + amount
+
+    net_income = total_income - total_expenses
+    average_transaction_amount = net_income / transactions_count if transactions_count > 0 else 0.0
+
     return {
         "total_income": round(total_income, 2),
         "total_expenses": round(total_expenses, 2),
@@ -213,62 +599,9 @@ def get_transaction_stats(db: Session, user_id: int) -> dict:
         "monthly_summary": monthly_summary
     }
 
-def get_holidays(db: Session, country_code: str, start_date: date, end_date: date) -> List[models.HolidayEvent]:
+def get_holidays(db: Session, country_code: str, start_date: date, end_date: date) -> List[CalendarEvent]:
     ensure_holidays_for_range(db, country_code, start_date, end_date)
-    return db.query(models.HolidayEvent).filter(
-        models.HolidayEvent.country_code == country_code,
-        models.HolidayEvent.date >= start_date,
-        models.HolidayEvent.date <= end_date
-    ).order_by(models.HolidayEvent.date.asc()).all()
-
-def _date_range_to_datetimes(start_date: date, end_date: date):
-    start_dt = datetime.combine(start_date, datetime.min.time())
-    end_dt = datetime.combine(end_date, datetime.max.time())
-    return start_dt, end_dt
-
-def _sum_expenses(db: Session, user_id: int, start_date: date, end_date: date) -> float:
-    start_dt, end_dt = _date_range_to_datetimes(start_date, end_date)
-    total = db.query(func.sum(models.Transaction.amount)).filter(
-        models.Transaction.user_id == user_id,
-        models.Transaction.type == "expense",
-        models.Transaction.date >= start_dt,
-        models.Transaction.date <= end_dt
-    ).scalar()
-    return float(total or 0.0)
-
-def _sum_expenses_for_category(db: Session, user_id: int, category: str, start_date: date, end_date: date) -> float:
-    start_dt, end_dt = _date_range_to_datetimes(start_date, end_date)
-    total = db.query(func.sum(models.Transaction.amount)).filter(
-        models.Transaction.user_id == user_id,
-        models.Transaction.type == "expense",
-        models.Transaction.category == category,
-        models.Transaction.date >= start_dt,
-        models.Transaction.date <= end_dt
-    ).scalar()
-    return float(total or 0.0)
-
-def _count_expense_transactions(db: Session, user_id: int, start_date: date, end_date: date) -> int:
-    start_dt, end_dt = _date_range_to_datetimes(start_date, end_date)
-    count = db.query(func.count(models.Transaction.id)).filter(
-        models.Transaction.user_id == user_id,
-        models.Transaction.type == "expense",
-        models.Transaction.date >= start_dt,
-        models.Transaction.date <= end_dt
-    ).scalar()
-    return int(count or 0)
-
-def _sum_expenses_by_category(db: Session, user_id: int, start_date: date, end_date: date) -> Dict[str, float]:
-    start_dt, end_dt = _date_range_to_datetimes(start_date, end_date)
-    rows = db.query(
-        models.Transaction.category,
-        func.sum(models.Transaction.amount)
-    ).filter(
-        models.Transaction.user_id == user_id,
-        models.Transaction.type == "expense",
-        models.Transaction.date >= start_dt,
-        models.Transaction.date <= end_dt
-    ).group_by(models.Transaction.category).all()
-    return {row[0]: float(row[1] or 0.0) for row in rows}
+    return holiday_calendar.for_country(db, country_code).between(start_date, end_date)
 
 def _get_month_range(target_date: date):
     start = date(target_date.year, target_date.month, 1)
@@ -283,6 +616,15 @@ def _get_week_range(target_date: date):
     end = start + timedelta(days=6)
     return start, end
 
+def _get_year_range(target_date: date):
+    return date(target_date.year, 1, 1), date(target_date.year, 12, 31)
+
+BUDGET_PERIOD_RANGES = {
+    "weekly": _get_week_range,
+    "monthly": _get_month_range,
+    "yearly": _get_year_range,
+}
+
 def _compute_confidence(sample_count: int, pct_changes: List[float]) -> str:
     if sample_count >= 3:
         mean = sum(pct_changes) / sample_count
@@ -294,6 +636,27 @@ def _compute_confidence(sample_count: int, pct_changes: List[float]) -> str:
         return "medium"
     return "low"
 
+def filter_events_for_user(user: models.User, events: List[CalendarEvent]) -> List[CalendarEvent]:
+    """
+    Keep only events matching the user's culture tags (all events if none are set)
+    """
+    try:
+        user_tags = json.loads(user.culture_tags or "[]")
+    except json.JSONDecodeError:
+        user_tags = []
+    if not user_tags:
+        return events
+
+    filtered = []
+    for event in events:
+        try:
+            event_tags = json.loads(event.tags or "[]")
+        except json.JSONDecodeError:
+            event_tags = []
+        if any(tag in event_tags for tag in user_tags):
+            filtered.append(event)
+    return filtered
+
 def get_holiday_insights(
     db: Session,
     user: models.User,
@@ -305,50 +668,58 @@ def get_holiday_insights(
     window_end = today + timedelta(days=window_days)
     country_code = user.country_code or "US"
     ensure_holidays_for_range(db, country_code, today, window_end)
-    try:
-        user_tags = json.loads(user.culture_tags or "[]")
-    except json.JSONDecodeError:
-        user_tags = []
-
-    upcoming = db.query(models.HolidayEvent).filter(
-        models.HolidayEvent.country_code == country_code,
-        models.HolidayEvent.date >= today,
-        models.HolidayEvent.date <= window_end
-    ).order_by(models.HolidayEvent.date.asc()).all()
-
-    if user_tags:
-        filtered = []
-        for event in upcoming:
-            try:
-                event_tags = json.loads(event.tags or "[]")
-            except json.JSONDecodeError:
-                event_tags = []
-            if any(tag in event_tags for tag in user_tags):
-                filtered.append(event)
-        upcoming = filtered
+    calendar = holiday_calendar.for_country(db, country_code)
+    upcoming = filter_events_for_user(user, calendar.between(today, window_end))
+
+    now = datetime.utcnow()
+    cached_by_event: Dict[int, models.HolidayInsight] = {}
+    if not force and upcoming:
+        cached_rows = db.query(models.HolidayInsight).filter(
+            models.HolidayInsight.user_id == user.id,
+            models.HolidayInsight.holiday_event_id.in_([event.id for event in upcoming])
+        ).all()
+        windows = {event.id: holiday_window(event.date)[0] for event in upcoming}
+        for row in cached_rows:
+            if row.window_start == windows[row.holiday_event_id]:
+                cached_by_event.setdefault(row.holiday_event_id, row)
+
+    pending = []
+    for event in upcoming:
+        cached = cached_by_event.get(event.id)
+        if not (cached and cached.expires_at and cached.expires_at > now):
+            pending.append(event)
+    pending_ids = {event.id for event in pending}
+
+    lookback = timedelta(days=365 * lookback_years + 30)
+    history = {event.id: calendar.occurrences(event.name, event.date - lookback, event.date) for event in pending}
+
+    dependencies: Dict[int, List[Tuple[date, date]]] = {}
+    for event in pending:
+        event_ranges = []
+        for sample in history[event.id]:
+            holiday_start, holiday_end = holiday_window(sample.date)
+            event_ranges.append((holiday_start, holiday_end))
+            event_ranges.append(_baseline_window(holiday_start, holiday_end))
+        dependencies[event.id] = event_ranges
+    budget_map: Dict[str, models.Budget] = {}
+    budget_ranges: List[Tuple[date, date]] = []
+    if pending:
+        budgets = db.query(models.Budget).filter(models.Budget.user_id == user.id).all()
+        budget_map = {budget.category: budget for budget in budgets}
+        if budget_map:
+            budget_ranges = [_get_week_range(today), _get_month_range(today)]
+    for event_id in dependencies:
+        dependencies[event_id] = merge_ranges(dependencies[event_id] + budget_ranges)
+    ranges = [item for event_ranges in dependencies.values() for item in event_ranges]
+    series = ExpenseSeries.load(db, user.id, ranges)
 
     insights: List[Dict[str, Any]] = []
     for event in upcoming:
-        window_start = event.date - timedelta(days=7)
-        window_end = event.date + timedelta(days=2)
-
-        cached = None
-        if not force:
-            cached = db.query(models.HolidayInsight).filter(
-                models.HolidayInsight.user_id == user.id,
-                models.HolidayInsight.holiday_event_id == event.id,
-                models.HolidayInsight.window_start == window_start
-            ).order_by(models.HolidayInsight.generated_at.desc()).first()
-            if cached and cached.expires_at and cached.expires_at > datetime.utcnow():
-                insights.append(_format_insight_response(event, cached))
-                continue
+        window_start, window_end = holiday_window(event.date)
 
-        historical = db.query(models.HolidayEvent).filter(
-            models.HolidayEvent.country_code == country_code,
-            models.HolidayEvent.name == event.name,
-            models.HolidayEvent.date < event.date,
-            models.HolidayEvent.date >= event.date - timedelta(days=365 * lookback_years + 30)
-        ).order_by(models.HolidayEvent.date.desc()).all()
+        if event.id not in pending_ids:
+            insights.append(_format_insight_response(event, cached_by_event[event.id]))
+            continue
 
         sample_spend = []
         sample_baseline = []
@@ -356,21 +727,19 @@ def get_holiday_insights(
         category_deltas: Dict[str, float] = {}
         transaction_samples = 0
 
-        for sample in historical:
-            holiday_start = sample.date - timedelta(days=7)
-            holiday_end = sample.date + timedelta(days=2)
-            baseline_start = holiday_start - timedelta(days=28)
-            baseline_end = holiday_end - timedelta(days=28)
+        for sample in history[event.id]:
+            holiday_start, holiday_end = holiday_window(sample.date)
+            baseline_start, baseline_end = _baseline_window(holiday_start, holiday_end)
 
-            holiday_spend = _sum_expenses(db, user.id, holiday_start, holiday_end)
-            baseline_spend = _sum_expenses(db, user.id, baseline_start, baseline_end)
-            transaction_samples += _count_expense_transactions(db, user.id, holiday_start, holiday_end)
+            holiday_spend = series.total(holiday_start, holiday_end)
+            baseline_spend = series.total(baseline_start, baseline_end)
+            transaction_samples += series.count(holiday_start, holiday_end)
 
             if baseline_spend <= 0:
                 continue
 
-            holiday_categories = _sum_expenses_by_category(db, user.id, holiday_start, holiday_end)
-            baseline_categories = _sum_expenses_by_category(db, user.id, baseline_start, baseline_end)
+            holiday_categories = series.by_category(holiday_start, holiday_end)
+            baseline_categories = series.by_category(baseline_start, baseline_end)
 
             for category, value in holiday_categories.items():
                 delta = value - baseline_categories.get(category, 0.0)
@@ -384,7 +753,7 @@ def get_holiday_insights(
         sample_count = len(sample_spend)
         if sample_count < 2 or transaction_samples < 5:
             insight = _build_insufficient_insight(event, window_start, window_end, sample_count)
-            _save_insight(db, user.id, event.id, insight)
+            _save_insight(db, user.id, event.id, {**insight, "dependency_ranges": dependencies[event.id]})
             insights.append(insight)
             continue
 
@@ -402,8 +771,6 @@ def get_holiday_insights(
         ]
 
         recommended_adjustment_pct = 0.0
-        budgets = db.query(models.Budget).filter(models.Budget.user_id == user.id).all()
-        budget_map = {budget.category: budget for budget in budgets}
         for item in top_categories:
             budget = budget_map.get(item["category"])
             if not budget:
@@ -412,7 +779,7 @@ def get_holiday_insights(
                 spend_start, spend_end = _get_week_range(today)
             else:
                 spend_start, spend_end = _get_month_range(today)
-            spent = _sum_expenses_for_category(db, user.id, item["category"], spend_start, spend_end)
+            spent = series.category_total(item["category"], spend_start, spend_end)
             remaining = max(budget.amount - spent, 0.0)
             expected_delta = item["delta"]
             if expected_delta > remaining and expected_delta > 0:
@@ -439,63 +806,25 @@ def get_holiday_insights(
             "holiday_spend": holiday_spend_avg,
             "pct_change": pct_change_avg,
             "window_start": window_start,
-            "window_end": window_end
+            "window_end": window_end,
+            "dependency_ranges": dependencies[event.id]
         })
         insights.append(insight)
 
     return insights
 
-def ensure_holidays_for_range(db: Session, country_code: str, start_date: date, end_date: date) -> int:
-    if settings.HOLIDAY_API_PROVIDER != "calendarific":
-        return 0
-    if not settings.CALENDARIFIC_API_KEY:
-        return 0
+def holiday_window(event_date: date):
+    return event_date - timedelta(days=7), event_date + timedelta(days=2)
 
-    inserted = 0
-    for year in range(start_date.year, end_date.year + 1):
-        year_start = date(year, 1, 1)
-        year_end = date(year, 12, 31)
-        existing_api = db.query(models.HolidayEvent).filter(
-            models.HolidayEvent.country_code == country_code,
-            models.HolidayEvent.source == "calendarific",
-            models.HolidayEvent.date >= year_start,
-            models.HolidayEvent.date <= year_end
-        ).count()
-        if existing_api > 0:
-            continue
-        fetched = fetch_calendarific_holidays(country_code, year)
-        if not fetched:
-            continue
-        existing_keys = {
-            (row[0], row[1], row[2])
-            for row in db.query(
-                models.HolidayEvent.name,
-                models.HolidayEvent.date,
-                models.HolidayEvent.country_code
-            ).filter(
-                models.HolidayEvent.country_code == country_code,
-                models.HolidayEvent.date >= year_start,
-                models.HolidayEvent.date <= year_end
-            ).all()
-        }
-        records = []
-        for item in fetched:
-            key = (item["name"], item["date"], item["country_code"])
-            if key in existing_keys:
-                continue
-            records.append(models.HolidayEvent(
-                name=item["name"],
-                date=item["date"],
-                country_code=item["country_code"],
-                type=item["type"],
-                tags=json.dumps(item.get("tags", [])),
-                source=item.get("source", "calendarific")
-            ))
-        if records:
-            db.add_all(records)
-            db.commit()
-            inserted += len(records)
-    return inserted
+def _baseline_window(holiday_start: date, holiday_end: date):
+    return holiday_start - timedelta(days=28), holiday_end - timedelta(days=28)
+
+def ensure_holidays_for_range(db: Session, country_code: str, start_date: date, end_date: date) -> int:
+    """
+    Queue a background provider sync for years in the range that have no provider
+    data yet. Request handlers only ever read local holiday data.
+    """
+    return holiday_sync.request(db, country_code, start_date, end_date)
 
 def _build_explanation(holiday_name: str, sample_count: int, pct_change: float, delta: float, top_categories: List[Dict[str, Any]]) -> str:
     change_pct = round(pct_change * 100, 1)
@@ -503,7 +832,7 @@ def _build_explanation(holiday_name: str, sample_count: int, pct_change: float,
     categories = ", ".join([item["category"] for item in top_categories]) or "your usual categories"
     return f"Based on your last {sample_count} {holiday_name} periods, spending changed {change_sign}{change_pct}% (~${abs(delta):.0f}), mostly in {categories}."
 
-def _build_insufficient_insight(event: models.HolidayEvent, window_start: date, window_end: date, sample_count: int) -> Dict[str, Any]:
+def _build_insufficient_insight(event: CalendarEvent, window_start: date, window_end: date, sample_count: int) -> Dict[str, Any]:
     return {
         "holiday_event_id": event.id,
         "holiday_name": event.name,
@@ -522,27 +851,121 @@ def _build_insufficient_insight(event: models.HolidayEvent, window_start: date,
     }
 
 def _save_insight(db: Session, user_id: int, event_id: int, insight_data: Dict[str, Any]) -> None:
-    expires_at = datetime.utcnow() + timedelta(hours=12)
-    record = models.HolidayInsight(
-        user_id=user_id,
-        holiday_event_id=event_id,
-        window_start=insight_data.get("window_start"),
-        window_end=insight_data.get("window_end"),
-        baseline_spend=insight_data.get("baseline_spend", 0.0),
-        holiday_spend=insight_data.get("holiday_spend", 0.0),
-        pct_change=insight_data.get("pct_change", 0.0),
-        confidence=insight_data.get("confidence", "low"),
-        top_categories_json=json.dumps(insight_data.get("top_categories", [])),
-        recommended_adjustment_pct=insight_data.get("recommended_adjustment_pct", 0.0),
-        explanation=insight_data.get("explanation", ""),
-        status=insight_data.get("status", "ok"),
-        generated_at=datetime.utcnow(),
-        expires_at=expires_at
+    """
+    Upsert the cached insight keyed on (user_id, holiday_event_id, window_start)
+    """
+    now = datetime.utcnow()
+    # Recommendations are measured against this week's and month's budget
+    # spend, so a cached insight must not outlive the period it was built in
+    today = now.date()
+    period_end = min(_get_week_range(today)[1], _get_month_range(today)[1]) + timedelta(days=1)
+    values = {
+        "window_end": insight_data.get("window_end"),
+        "baseline_spend": insight_data.get("baseline_spend", 0.0),
+        "holiday_spend": insight_data.get("holiday_spend", 0.0),
+        "pct_change": insight_data.get("pct_change", 0.0),
+        "confidence": insight_data.get("confidence", "low"),
+        "top_categories_json": json.dumps(insight_data.get("top_categories", [])),
+        "recommended_adjustment_pct": insight_data.get("recommended_adjustment_pct", 0.0),
+        "explanation": insight_data.get("explanation", ""),
+        "status": insight_data.get("status", "ok"),
+        "dependency_ranges_json": json.dumps([
+            [start.isoformat(), end.isoformat()]
+            for start, end in insight_data.get("dependency_ranges", [])
+        ]),
+        "generated_at": now,
+        "expires_at": min(
+            now + timedelta(hours=settings.INSIGHT_CACHE_TTL_HOURS),
+            datetime.combine(period_end, datetime.min.time())
+        )
+    }
+    # Requests, the dashboard and the scheduler can save the same key at once;
+    # the upsert makes the last writer win instead of failing on the unique index
+    db_upsert.insert_on_conflict(
+        db,
+        models.HolidayInsight.__table__,
+        [{
+            "user_id": user_id,
+            "holiday_event_id": event_id,
+            "window_start": insight_data.get("window_start"),
+            **values
+        }],
+        ["user_id", "holiday_event_id", "window_start"],
+        lambda excluded: {key: getattr(excluded, key) for key in values}
     )
-    db.add(record)
     db.commit()
 
-def _format_insight_response(event: models.HolidayEvent, insight: models.HolidayInsight) -> Dict[str, Any]:
+def _insight_depends_on(insight: models.HolidayInsight, days: List[date]) -> bool:
+    if insight.dependency_ranges_json is None:
+        return True
+    try:
+        ranges = json.loads(insight.dependency_ranges_json)
+    except json.JSONDecodeError:
+        return True
+    for start, end in ranges:
+        start_day = date.fromisoformat(start)
+        end_day = date.fromisoformat(end)
+        if any(start_day <= day <= end_day for day in days):
+            return True
+    return False
+
+def invalidate_insights_for_days(db: Session, user_id: int, days: List[date]) -> int:
+    """
+    Expire the user's cached insights whose holiday or baseline windows contain
+    any of the given expense dates. Changes are flushed, not committed.
+    """
+    if not days:
+        return 0
+    now = datetime.utcnow()
+    cached = db.query(models.HolidayInsight).filter(
+        models.HolidayInsight.user_id == user_id,
+        models.HolidayInsight.expires_at > now
+    ).all()
+    invalidated = 0
+    for insight in cached:
+        if _insight_depends_on(insight, days):
+            insight.expires_at = now
+            invalidated += 1
+    if invalidated:
+        db.flush()
+    return invalidated
+
+def invalidate_user_insights(db: Session, user_id: int) -> int:
+    """
+    Expire all of the user's cached insights, e.g. after a budget change alters
+    every recommendation. Runs in the caller's transaction, not committed.
+    """
+    now = datetime.utcnow()
+    return db.query(models.HolidayInsight).filter(
+        models.HolidayInsight.user_id == user_id,
+        models.HolidayInsight.expires_at > now
+    ).update({models.HolidayInsight.expires_at: now}, synchronize_session=False)
+
+def compact_holiday_insights(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Evict expired insights and insights for events that already happened
+    """
+    now = now or datetime.utcnow()
+    past_events = select(models.HolidayEvent.id).where(models.HolidayEvent.date < now.date())
+    condition = or_(
+        models.HolidayInsight.expires_at < now,
+        models.HolidayInsight.holiday_event_id.in_(past_events)
+    )
+    payload_bytes = func.coalesce(func.length(models.HolidayInsight.top_categories_json), 0) \
+        + func.coalesce(func.length(models.HolidayInsight.explanation), 0) \
+        + func.coalesce(func.length(models.HolidayInsight.confidence), 0) \
+        + func.coalesce(func.length(models.HolidayInsight.status), 0) \
+        + INSIGHT_ROW_FIXED_BYTES
+    rows, reclaimed = db.query(
+        func.count(models.HolidayInsight.id),
+        func.sum(payload_bytes)
+    ).filter(condition).one()
+    if rows:
+        db.query(models.HolidayInsight).filter(condition).delete(synchronize_session=False)
+        db.commit()
+    return {"rows_deleted": int(rows or 0), "bytes_reclaimed": int(reclaimed or 0)}
+
+def _format_insight_response(event: CalendarEvent, insight: models.HolidayInsight) -> Dict[str, Any]:
     try:
         top_categories = json.loads(insight.top_categories_json or "[]")
     except json.JSONDecodeError:
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from . import crud, schemas
+from .database import ReadSessionLocal, SessionLocal
+from .user_cache import CachedUser
+
+def _run(session_factory, fn: Callable[..., Any], *args: Any) -> Any:
+    with session_factory() as db:
+        return fn(db, *args)
+
+def _stats_section(db, user: CachedUser) -> Dict[str, Any]:
+    return crud.get_transaction_stats(db, user_id=user.id)
+
+def _recent_transactions_section(db, user: CachedUser, limit: int):
+    transactions, _ = crud.get_transactions(db, user_id=user.id, limit=limit)
+    return [schemas.TransactionResponse.from_orm(transaction) for transaction in transactions]
+
+def _holidays_section(db, country_code: str, start: date, end: date):
+    return [schemas.HolidayEventResponse.from_orm(event) for event in crud.get_holidays(db, country_code, start, end)]
+
+def _insights_section(db, user: CachedUser, window_days: int):
+    if user.calendar_opt_in is False:
+        return []
+    return crud.get_holiday_insights(db, user, window_days=window_days)
+
+async def _timed(timings: Dict[str, float], name: str, session_factory, fn: Callable[..., Any], *args: Any) -> Any:
+    started = time.perf_counter()
+    try:
+        return await run_in_threadpool(_run, session_factory, fn, *args)
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
+async def build_dashboard(
+    user: CachedUser,
+    country_code: str,
+    start: date,
+    end: date,
+    window_days: int,
+    recent_limit: int
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Compute every dashboard section concurrently, each on its own session.
+    Insights may upsert their cache rows, so only that section uses a write session.
+    Returns the payload and per-section wall times in milliseconds.
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    stats, recent, holidays, insights = await asyncio.gather(
+        _timed(timings, "stats", ReadSessionLocal, _stats_section, user),
+        _timed(timings, "transactions", ReadSessionLocal, _recent_transactions_section, user, recent_limit),
+        _timed(timings, "holidays", ReadSessionLocal, _holidays_section, country_code, start, end),
+        _timed(timings, "insights", SessionLocal, _insights_section, user, window_days),
+    )
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return {
+        "stats": stats,
+        "recent_transactions": recent,
+        "holidays": holidays,
+        "insights": insights
+    }, timings
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
@@ -1,12 +1,21 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from .core.config import settings
+from .db_profiles import build_engine, is_memory_sqlite
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+READ_DATABASE_URL = settings.DATABASE_READ_URL or SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = build_engine(SQLALCHEMY_DATABASE_URL, settings.DB_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Reads get their own pool so analytical queries never hold a write connection.
+# An in-memory SQLite database only exists on the primary connection, so share it.
+if is_memory_sqlite(READ_DATABASE_URL):
+    read_engine = engine
+else:
+    read_engine = build_engine(READ_DATABASE_URL, settings.DB_PROFILE, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
\ No newline at end of file
@@ -1,37 +1,226 @@
-from sqlalchemy import text
+import argparse
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
 
 from .database import engine
 from . import models
 
-def ensure_schema() -> None:
-    _ensure_user_columns()
-    _ensure_tables()
-
-def _ensure_user_columns() -> None:
-    with engine.begin() as conn:
-        result = conn.execute(text("PRAGMA table_info(users)"))
-        existing = {row[1] for row in result.fetchall()}
-
-        if "country_code" not in existing:
-            conn.execute(text("ALTER TABLE users ADD COLUMN country_code VARCHAR"))
-            conn.execute(text("UPDATE users SET country_code='US' WHERE country_code IS NULL"))
-        if "timezone" not in existing:
-            conn.execute(text("ALTER TABLE users ADD COLUMN timezone VARCHAR"))
-            conn.execute(text("UPDATE users SET timezone='UTC' WHERE timezone IS NULL"))
-        if "culture_tags" not in existing:
-            conn.execute(text("ALTER TABLE users ADD COLUMN culture_tags TEXT"))
-            conn.execute(text("UPDATE users SET culture_tags='[]' WHERE culture_tags IS NULL"))
-        if "calendar_opt_in" not in existing:
-            conn.execute(text("ALTER TABLE users ADD COLUMN calendar_opt_in BOOLEAN"))
-            conn.execute(text("UPDATE users SET calendar_opt_in=1 WHERE calendar_opt_in IS NULL"))
-
-def _ensure_tables() -> None:
-    models.HolidayEvent.__table__.create(bind=engine, checkfirst=True)
-    models.HolidayInsight.__table__.create(bind=engine, checkfirst=True)
-
-    with engine.begin() as conn:
-        result = conn.execute(text("PRAGMA table_info(holiday_insights)"))
-        existing = {row[1] for row in result.fetchall()}
-        if "status" not in existing:
-            conn.execute(text("ALTER TABLE holiday_insights ADD COLUMN status VARCHAR"))
-            conn.execute(text("UPDATE holiday_insights SET status='ok' WHERE status IS NULL"))
+logger = logging.getLogger(__name__)
+
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+def _columns(conn: Connection, table: str) -> Set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+def _indexes(conn: Connection, table: str) -> Set[str]:
+    return {index["name"] for index in inspect(conn).get_indexes(table)}
+
+def _add_column(conn: Connection, table: str, column_name: str, backfill=None) -> None:
+    """
+    Add a model column to an existing table (if missing) and backfill a value
+    """
+    if column_name in _columns(conn, table):
+        return
+    model_table = models.Base.metadata.tables[table]
+    column = model_table.c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}"))
+    if backfill is not None:
+        conn.execute(model_table.update().where(column.is_(None)).values({column_name: backfill}))
+
+def _create_index(conn: Connection, table: str, index_name: str) -> None:
+    """
+    Create a model index unless the table already has an index of that name
+    """
+    if index_name in _indexes(conn, table):
+        return
+    index = next(index for index in models.Base.metadata.tables[table].indexes if index.name == index_name)
+    index.create(bind=conn)
+
+def _user_preference_columns(conn: Connection) -> None:
+    _add_column(conn, "users", "country_code", "US")
+    _add_column(conn, "users", "timezone", "UTC")
+    _add_column(conn, "users", "culture_tags", "[]")
+    _add_column(conn, "users", "calendar_opt_in", True)
+
+def _holiday_tables(conn: Connection) -> None:
+    models.HolidayEvent.__table__.create(bind=conn, checkfirst=True)
+    models.HolidayInsight.__table__.create(bind=conn, checkfirst=True)
+    _add_column(conn, "holiday_insights", "status", "ok")
+    _add_column(conn, "holiday_insights", "dependency_ranges_json")
+
+def _unique_insight_cache_key(conn: Connection) -> None:
+    unique = {
+        index["name"]
+        for index in inspect(conn).get_indexes("holiday_insights")
+        if index.get("unique")
+    }
+    if "ix_holiday_insights_user_event_window" in unique:
+        return
+    # Keep only the newest row per cache key before enforcing uniqueness
+    conn.execute(text(
+        "DELETE FROM holiday_insights WHERE id NOT IN ("
+        "SELECT keep.id FROM (SELECT MAX(id) AS id FROM holiday_insights "
+        "GROUP BY user_id, holiday_event_id, window_start) keep)"
+    ))
+    if "ix_holiday_insights_user_event_window" in _indexes(conn, "holiday_insights"):
+        conn.execute(text("DROP INDEX ix_holiday_insights_user_event_window"))
+    _create_index(conn, "holiday_insights", "ix_holiday_insights_user_event_window")
+
+def _query_indexes(conn: Connection) -> None:
+    _create_index(conn, "transactions", "ix_transactions_user_date")
+    _create_index(conn, "transactions", "ix_transactions_user_type_date_category")
+    _create_index(conn, "budgets", "ix_budgets_user_id")
+
+def _user_data_version(conn: Connection) -> None:
+    _add_column(conn, "users", "data_version", 0)
+
+def _unique_holiday_event_key(conn: Connection) -> None:
+    if "uq_holiday_events_country_date_name" in _indexes(conn, "holiday_events"):
+        return
+    duplicates = (
+        "SELECT id FROM holiday_events WHERE id NOT IN ("
+        "SELECT keep.id FROM (SELECT MIN(id) AS id FROM holiday_events "
+        "GROUP BY country_code, date, name) keep)"
+    )
+    # Insights cached against a duplicate are dropped, not repointed; they are recomputed on demand
+    conn.execute(text(f"DELETE FROM holiday_insights WHERE holiday_event_id IN ({duplicates})"))
+    conn.execute(text(f"DELETE FROM holiday_events WHERE id IN ({duplicates})"))
+    _create_index(conn, "holiday_events", "uq_holiday_events_country_date_name")
+
+# Ordered and append-only: never renumber or edit a migration that has shipped
+MIGRATIONS: List[Migration] = [
+    Migration(1, "user preference columns", _user_preference_columns),
+    Migration(2, "holiday tables and insight columns", _holiday_tables),
+    Migration(3, "unique holiday insight cache key", _unique_insight_cache_key),
+    Migration(4, "composite transaction and budget indexes", _query_indexes),
+    Migration(5, "user data version", _user_data_version),
+    Migration(6, "unique holiday event key", _unique_holiday_event_key),
+]
+
+def applied_versions(bind: Optional[Engine] = None) -> Set[int]:
+    with (bind or engine).connect() as conn:
+        if not inspect(conn).has_table("schema_version"):
+            return set()
+        return {row[0] for row in conn.execute(select(schema_version_table.c.version))}
+
+def run_migrations(bind: Optional[Engine] = None) -> List[int]:
+    """
+    Apply every migration newer than the recorded schema version, each in its
+    own transaction. Migrations check the live schema first, so running them
+    against a database create_all already built just records the version.
+    """
+    bind = bind or engine
+    schema_version_table.create(bind=bind, checkfirst=True)
+    done = applied_versions(bind)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done:
+            continue
+        with bind.begin() as conn:
+            migration.apply(conn)
+            conn.execute(schema_version_table.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow()
+            ))
+        logger.info("Applied migration %s: %s", migration.version, migration.name)
+        applied.append(migration.version)
+    return applied
+
+def ensure_schema() -> List[int]:
+    return run_migrations(engine)
+
+def _captured_selects(bind: Engine, run: Callable[[Session], Any]) -> List[Tuple[str, Any]]:
+    """
+    Run an app code path and capture the SELECTs it sends to the driver
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", capture)
+    try:
+        with Session(bind=bind) as db:
+            run(db)
+    finally:
+        event.remove(bind, "before_cursor_execute", capture)
+    return captured
+
+def explain_hot_queries(bind: Optional[Engine] = None, user_id: int = 1) -> Dict[str, List[str]]:
+    """
+    SQLite query plans for the hot read paths, captured from the same code the
+    app runs: a keyset transaction page, the insight expense series, the
+    budget list and the rollup-backed transaction stats
+    """
+    from . import crud
+    from .expense_series import ExpenseSeries
+
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return {}
+    today = date.today()
+    after = crud.encode_transaction_cursor(SimpleNamespace(date=datetime.utcnow(), id=2 ** 31))
+    paths: Dict[str, Callable[[Session], Any]] = {
+        "transaction page": lambda db: crud.get_transactions(db, user_id, limit=50, cursor=after),
+        "insight expense series": lambda db: ExpenseSeries.load(db, user_id, [
+            (today - timedelta(days=400), today - timedelta(days=330)),
+            (today - timedelta(days=30), today)
+        ]),
+        "budget list": lambda db: crud.get_budgets(db, user_id),
+        "transaction stats": lambda db: crud.get_transaction_stats(db, user_id),
+    }
+    captured = {label: _captured_selects(bind, run) for label, run in paths.items()}
+    plans: Dict[str, List[str]] = {}
+    with bind.connect() as conn:
+        for label, statements in captured.items():
+            plans[label] = [
+                row[-1]
+                for statement, parameters in statements
+                for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            ]
+    return plans
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "explain"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "upgrade":
+        models.Base.metadata.create_all(bind=engine)
+        applied = run_migrations()
+        print(f"Applied {len(applied)} migrations")
+        return 0
+    if args.command == "explain":
+        for label, plan in explain_hot_queries().items():
+            for line in plan:
+                print(f"{label}: {line}")
+        return 0
+    done = applied_versions()
+    for migration in MIGRATIONS:
+        print(f"{migration.version:>4} {'applied' if migration.version in done else 'pending':<8} {migration.name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
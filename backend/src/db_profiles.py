@@ -0,0 +1,163 @@
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store", "busy_timeout")
+
+# Per-connection SQLite pragmas and pool sizing for each workload.
+# "legacy" reproduces the old create_engine(url) behaviour for comparison.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "legacy": {
+        "pragmas": {},
+        "pool_size": None,
+        "max_overflow": None,
+    },
+    "web": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 268435456,
+            "cache_size": -65536,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        "pool_size": 10,
+        "max_overflow": 20,
+    },
+    "batch": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 1073741824,
+            "cache_size": -262144,
+            "temp_store": "MEMORY",
+            "busy_timeout": 30000,
+        },
+        "pool_size": 2,
+        "max_overflow": 2,
+    },
+    "durable": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "cache_size": -65536,
+            "temp_store": "MEMORY",
+            "busy_timeout": 10000,
+        },
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+}
+
+def resolve_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Look up a profile and apply DB_* / SQLITE_* overrides from settings
+    """
+    name = name or settings.DB_PROFILE
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile: {name}")
+    profile = {
+        "name": name,
+        "pragmas": dict(ENGINE_PROFILES[name]["pragmas"]),
+        "pool_size": ENGINE_PROFILES[name]["pool_size"],
+        "max_overflow": ENGINE_PROFILES[name]["max_overflow"],
+    }
+    for pragma, value in settings.SQLITE_PRAGMA_OVERRIDES.items():
+        profile["pragmas"][pragma] = value
+    if settings.DB_POOL_SIZE is not None:
+        profile["pool_size"] = settings.DB_POOL_SIZE
+    if settings.DB_MAX_OVERFLOW is not None:
+        profile["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return profile
+
+def _apply_pragmas(dbapi_connection, pragmas: Dict[str, Any]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first so a concurrent journal_mode switch waits instead of failing
+        if "busy_timeout" in pragmas:
+            cursor.execute(f"PRAGMA busy_timeout={int(pragmas['busy_timeout'])}")
+        for pragma, value in pragmas.items():
+            if pragma != "busy_timeout":
+                cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+def build_engine(url: str, profile_name: Optional[str] = None, read_only: bool = False, **overrides: Any) -> Engine:
+    """
+    Create an engine for `url` configured by the named profile. A read_only
+    engine rejects writes at the connection level (query_only on SQLite,
+    read-only default transactions on PostgreSQL).
+    """
+    profile = resolve_profile(profile_name)
+    parsed = make_url(url)
+    kwargs: Dict[str, Any] = {}
+    if read_only and parsed.get_backend_name() == "sqlite":
+        profile["pragmas"]["query_only"] = "ON"
+
+    if parsed.get_backend_name() == "sqlite":
+        if profile["name"] != "legacy":
+            # Sessions are handed between threadpool threads; pooled connections must allow that
+            kwargs["connect_args"] = {"check_same_thread": False}
+            if is_memory_sqlite(url):
+                kwargs["poolclass"] = StaticPool
+            else:
+                # SQLAlchemy 1.4 defaults file databases to NullPool (a new connection per checkout)
+                kwargs["poolclass"] = QueuePool
+                kwargs["pool_size"] = profile["pool_size"]
+                kwargs["max_overflow"] = profile["max_overflow"]
+                kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    else:
+        if read_only and parsed.get_backend_name() == "postgresql":
+            kwargs["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+        kwargs["pool_pre_ping"] = True
+        kwargs["pool_timeout"] = settings.DB_POOL_TIMEOUT
+        if profile["pool_size"] is not None:
+            kwargs["pool_size"] = profile["pool_size"]
+            kwargs["max_overflow"] = profile["max_overflow"]
+    kwargs.update(overrides)
+
+    engine = create_engine(url, **kwargs)
+    if parsed.get_backend_name() == "sqlite" and profile["pragmas"]:
+        pragmas = profile["pragmas"]
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            _apply_pragmas(dbapi_connection, pragmas)
+
+    engine.profile = profile
+    engine.read_only = read_only
+    return engine
+
+def describe_engine(engine: Engine) -> Dict[str, Any]:
+    """
+    Report the settings a live connection actually runs with
+    """
+    profile = getattr(engine, "profile", {"name": "unknown"})
+    pool = engine.pool
+    report: Dict[str, Any] = {
+        "profile": profile["name"],
+        "read_only": getattr(engine, "read_only", False),
+        "dialect": engine.dialect.name,
+        "pool": type(pool).__name__,
+        "pool_size": pool.size() if hasattr(pool, "size") else None,
+        "max_overflow": getattr(pool, "_max_overflow", None),
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for pragma in SQLITE_PRAGMAS:
+                report[pragma] = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+    return report
+
+def log_engine_settings(engine: Engine) -> None:
+    logger.info("Database engine settings: %s", describe_engine(engine))
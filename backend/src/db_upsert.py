@@ -0,0 +1,40 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+def insert_on_conflict(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update: Optional[Callable[[Any], Dict[str, Any]]] = None
+) -> int:
+    """
+    Insert rows in one statement; a row whose unique key already exists is
+    updated in place with update(excluded), where excluded proxies the values
+    that failed to insert, or skipped when update is None. Runs in the
+    caller's transaction, not committed. Returns the driver's rowcount.
+    """
+    if not rows:
+        return 0
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table).values(rows)
+        if update is None:
+            return db.execute(statement.prefix_with("IGNORE")).rowcount
+        return db.execute(statement.on_duplicate_key_update(update(statement.inserted))).rowcount
+    else:
+        raise ValueError(f"Unsupported dialect for upserts: {dialect} (expected sqlite, postgresql, mysql or mariadb)")
+    statement = insert(table).values(rows)
+    if update is None:
+        return db.execute(statement.on_conflict_do_nothing(index_elements=list(index_elements))).rowcount
+    return db.execute(statement.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_=update(statement.excluded)
+    )).rowcount
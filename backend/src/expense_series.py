@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from itertools import accumulate
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from . import models
+
+DateRange = Tuple[date, date]
+
+def merge_ranges(ranges: Iterable[DateRange]) -> List[DateRange]:
+    """
+    Collapse overlapping or adjacent inclusive date ranges
+    """
+    merged: List[List[date]] = []
+    for start, end in sorted(ranges):
+        if merged and start.toordinal() <= merged[-1][1].toordinal() + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+class ExpenseSeries:
+    """
+    Per-day expense totals with prefix sums, so any inclusive date window
+    can be summed, counted or broken down by category with two bisects.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[datetime, str, float]]):
+        per_day: Dict[date, Dict[str, List[float]]] = {}
+        for tx_date, category, amount in rows:
+            day = tx_date.date() if isinstance(tx_date, datetime) else tx_date
+            bucket = per_day.setdefault(day, {}).setdefault(category, [0.0, 0])
+            bucket[0] += float(amount or 0.0)
+            bucket[1] += 1
+
+        self.days: List[date] = sorted(per_day)
+        self.categories: List[str] = sorted({category for day in per_day.values() for category in day})
+        self._total_prefix = self._prefix(sum(item[0] for item in per_day[day].values()) for day in self.days)
+        self._count_prefix = self._prefix(sum(item[1] for item in per_day[day].values()) for day in self.days)
+        self._category_prefix: Dict[str, Tuple[List[float], List[int]]] = {}
+        for category in self.categories:
+            cells = [per_day[day].get(category, (0.0, 0)) for day in self.days]
+            self._category_prefix[category] = (
+                self._prefix(cell[0] for cell in cells),
+                self._prefix(cell[1] for cell in cells)
+            )
+
+    @staticmethod
+    def _prefix(values: Iterable) -> list:
+        return list(accumulate(values, initial=0))
+
+    @classmethod
+    def load(cls, db: Session, user_id: int, ranges: Sequence[DateRange]) -> "ExpenseSeries":
+        """
+        Fetch the user's expenses for every range in a single query
+        """
+        merged = merge_ranges(ranges)
+        if not merged:
+            return cls([])
+        clauses = [
+            and_(
+                models.Transaction.date >= datetime.combine(start, datetime.min.time()),
+                models.Transaction.date <= datetime.combine(end, datetime.max.time())
+            )
+            for start, end in merged
+        ]
+        rows = db.query(
+            models.Transaction.date,
+            models.Transaction.category,
+            models.Transaction.amount
+        ).filter(
+            models.Transaction.user_id == user_id,
+            models.Transaction.type == "expense",
+            or_(*clauses)
+        ).all()
+        return cls(rows)
+
+    def _bounds(self, start_date: date, end_date: date) -> Tuple[int, int]:
+        return bisect_left(self.days, start_date), bisect_right(self.days, end_date)
+
+    def total(self, start_date: date, end_date: date) -> float:
+        lo, hi = self._bounds(start_date, end_date)
+        return float(self._total_prefix[hi] - self._total_prefix[lo])
+
+    def count(self, start_date: date, end_date: date) -> int:
+        lo, hi = self._bounds(start_date, end_date)
+        return int(self._count_prefix[hi] - self._count_prefix[lo])
+
+    def category_total(self, category: str, start_date: date, end_date: date) -> float:
+        prefix = self._category_prefix.get(category)
+        if prefix is None:
+            return 0.0
+        lo, hi = self._bounds(start_date, end_date)
+        return float(prefix[0][hi] - prefix[0][lo])
+
+    def by_category(self, start_date: date, end_date: date) -> Dict[str, float]:
+        lo, hi = self._bounds(start_date, end_date)
+        breakdown: Dict[str, float] = {}
+        for category in self.categories:
+            sums, counts = self._category_prefix[category]
+            if counts[hi] - counts[lo] > 0:
+                breakdown[category] = float(sums[hi] - sums[lo])
+        return breakdown
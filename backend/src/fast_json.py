@@ -0,0 +1,38 @@
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode to the same bytes FastAPI's JSONResponse would produce
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> list:
+    return [dict(zip(fields, row)) for row in rows]
+
+def rows_response(rows: Iterable[Sequence[Any]], fields: Sequence[str], headers: dict = None) -> Response:
+    """
+    Response for a list of column tuples, skipping pydantic validation
+    """
+    return Response(content=dumps(rows_to_dicts(rows, fields)), media_type="application/json", headers=headers)
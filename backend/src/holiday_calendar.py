@@ -0,0 +1,134 @@
+import hashlib
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .core.config import settings
+
+class CalendarEvent(NamedTuple):
+    """
+    Detached, immutable copy of a holiday_events row
+    """
+    id: int
+    name: str
+    date: date
+    country_code: str
+    type: str
+    tags: str
+    source: str
+
+class CountryCalendar:
+    """
+    Sorted holidays for one country with a name -> occurrences index
+    """
+
+    def __init__(self, events: List[CalendarEvent]):
+        self.events: Tuple[CalendarEvent, ...] = tuple(sorted(events, key=lambda event: (event.date, event.id)))
+        # Content digest, identical in every process holding the same rows; tags responses
+        self.fingerprint = hashlib.sha256(repr(self.events).encode()).hexdigest()[:24]
+        self.dates: Tuple[date, ...] = tuple(event.date for event in self.events)
+        by_name: Dict[str, List[CalendarEvent]] = {}
+        for event in self.events:
+            by_name.setdefault(event.name, []).append(event)
+        self._by_name: Dict[str, Tuple[Tuple[date, ...], Tuple[CalendarEvent, ...]]] = {
+            name: (tuple(item.date for item in items), tuple(items))
+            for name, items in by_name.items()
+        }
+
+    def between(self, start_date: date, end_date: date) -> List[CalendarEvent]:
+        """
+        Events with start_date <= date <= end_date, oldest first
+        """
+        lo = bisect_left(self.dates, start_date)
+        hi = bisect_right(self.dates, end_date)
+        return list(self.events[lo:hi])
+
+    def occurrences(self, name: str, start_date: date, before: date) -> List[CalendarEvent]:
+        """
+        Events called `name` with start_date <= date < before, newest first
+        """
+        entry = self._by_name.get(name)
+        if entry is None:
+            return []
+        dates, events = entry
+        lo = bisect_left(dates, start_date)
+        hi = bisect_left(dates, before)
+        return list(reversed(events[lo:hi]))
+
+EMPTY_CALENDAR = CountryCalendar([])
+
+class HolidayCalendarIndex:
+    """
+    Process-wide snapshot of holiday_events, replaced wholesale on rebuild.
+    Only one thread rebuilds at a time; while a stale snapshot is being
+    refreshed, other readers keep serving it.
+    """
+
+    def __init__(self, refresh_seconds: int = settings.HOLIDAY_CALENDAR_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._calendars: Optional[Dict[str, CountryCalendar]] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> int:
+        with self._rebuild_lock:
+            return self._rebuild(db)
+
+    def _rebuild(self, db: Session) -> int:
+        rows = db.query(
+            models.HolidayEvent.id,
+            models.HolidayEvent.name,
+            models.HolidayEvent.date,
+            models.HolidayEvent.country_code,
+            models.HolidayEvent.type,
+            models.HolidayEvent.tags,
+            models.HolidayEvent.source
+        ).all()
+        grouped: Dict[str, List[CalendarEvent]] = {}
+        for row in rows:
+            event = CalendarEvent(*row)
+            grouped.setdefault(event.country_code, []).append(event)
+        calendars = {country: CountryCalendar(events) for country, events in grouped.items()}
+        with self._lock:
+            self._calendars = calendars
+            self._built_at = time.monotonic()
+        return len(rows)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._calendars = None
+
+    def _is_stale(self) -> bool:
+        return self.refresh_seconds > 0 and time.monotonic() - self._built_at > self.refresh_seconds
+
+    def _current(self, db: Session) -> Dict[str, CountryCalendar]:
+        calendars = self._calendars
+        if calendars is not None and not self._is_stale():
+            return calendars
+        # With a stale snapshot in hand, don't wait for another thread's rebuild
+        if not self._rebuild_lock.acquire(blocking=calendars is None):
+            return calendars
+        try:
+            # Re-check: the lock holder before us may have just rebuilt it
+            if self._calendars is None or self._is_stale():
+                self._rebuild(db)
+            return self._calendars or {}
+        finally:
+            self._rebuild_lock.release()
+
+    def warm(self, db: Session) -> None:
+        """
+        Build the index unless a current snapshot already exists
+        """
+        self._current(db)
+
+    def for_country(self, db: Session, country_code: str) -> CountryCalendar:
+        return self._current(db).get(country_code, EMPTY_CALENDAR)
+
+holiday_calendar = HolidayCalendarIndex()
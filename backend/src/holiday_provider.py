@@ -1,38 +1,93 @@
+import http.client
 import json
 import urllib.parse
-import urllib.request
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from .core.config import settings
 
-def fetch_calendarific_holidays(country_code: str, year: int) -> List[Dict[str, Any]]:
-    if not settings.CALENDARIFIC_API_KEY:
-        return []
+class CalendarificClient:
+    """
+    Calendarific API client that reuses one keep-alive connection per instance.
+    Instances are not thread-safe; give each fetcher thread its own.
+    """
 
-    params = {
-        "api_key": settings.CALENDARIFIC_API_KEY,
-        "country": country_code,
-        "year": year
-    }
-    url = "https://calendarific.com/api/v2/holidays?" + urllib.parse.urlencode(params)
-    request = urllib.request.Request(
-        url,
-        headers={"Accept": "application/json", "User-Agent": "expense-tracker/1.0"}
-    )
-    try:
-        with urllib.request.urlopen(request, timeout=10) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except Exception:
-        return []
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, timeout: float = 10):
+        self.api_key = api_key if api_key is not None else settings.CALENDARIFIC_API_KEY
+        parsed = urllib.parse.urlsplit(base_url or settings.CALENDARIFIC_BASE_URL)
+        self._scheme = parsed.scheme
+        self._netloc = parsed.netloc
+        self._path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._connection = connection_class(self._netloc, timeout=self.timeout)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get_json(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        url = self._path + path + "?" + urllib.parse.urlencode(params)
+        headers = {"Accept": "application/json", "User-Agent": "expense-tracker/1.0", "Connection": "keep-alive"}
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request("GET", url, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                # The server may have dropped an idle keep-alive connection; retry once on a fresh one
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                self.close()
+            if response.status != 200:
+                return None
+            return json.loads(body.decode("utf-8"))
+        return None
+
+    def fetch(self, country_code: str, year: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Fetch holidays and report "ok", "empty" or "error" alongside them
+        """
+        if not self.api_key:
+            return "error", []
+        try:
+            payload = self._get_json("/holidays", {
+                "api_key": self.api_key,
+                "country": country_code,
+                "year": year
+            })
+        except Exception:
+            return "error", []
+        if not payload:
+            return "error", []
+
+        holidays = payload.get("response", {}).get("holidays", [])
+        results: List[Dict[str, Any]] = []
+        for item in holidays:
+            normalized = _normalize_calendarific(item, country_code)
+            if normalized:
+                results.append(normalized)
+        return ("ok" if results else "empty"), results
 
-    holidays = payload.get("response", {}).get("holidays", [])
-    results: List[Dict[str, Any]] = []
-    for item in holidays:
-        normalized = _normalize_calendarific(item, country_code)
-        if normalized:
-            results.append(normalized)
-    return results
+    def fetch_holidays(self, country_code: str, year: int) -> List[Dict[str, Any]]:
+        return self.fetch(country_code, year)[1]
+
+def fetch_calendarific_holidays(country_code: str, year: int) -> List[Dict[str, Any]]:
+    client = CalendarificClient()
+    try:
+        return client.fetch_holidays(country_code, year)
+    finally:
+        client.close()
 
 def _normalize_calendarific(item: Dict[str, Any], country_code: str) -> Dict[str, Any] | None:
     name = item.get("name") or "Holiday"
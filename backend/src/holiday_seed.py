@@ -6,10 +6,13 @@ from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 
 from . import models
+from .holiday_calendar import holiday_calendar
+
+def holiday_data_path() -> str:
+    return os.path.join(os.path.dirname(__file__), "data", "holidays.json")
 
 def load_holiday_data() -> List[Dict[str, Any]]:
-    data_path = os.path.join(os.path.dirname(__file__), "data", "holidays.json")
-    with open(data_path, "r", encoding="utf-8") as handle:
+    with open(holiday_data_path(), "r", encoding="utf-8") as handle:
         return json.load(handle)
 
 def seed_holidays_missing(db: Session) -> int:
@@ -36,4 +39,5 @@ def seed_holidays_missing(db: Session) -> int:
     if records:
         db.add_all(records)
         db.commit()
+        holiday_calendar.rebuild(db)
     return len(records)
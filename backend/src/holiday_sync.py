@@ -0,0 +1,330 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from . import db_upsert, models
+from .core.config import settings
+from .database import SessionLocal
+from .holiday_calendar import holiday_calendar
+from .holiday_provider import CalendarificClient
+
+logger = logging.getLogger(__name__)
+
+CountryYear = Tuple[str, int]
+
+def provider_enabled() -> bool:
+    return settings.HOLIDAY_API_PROVIDER == "calendarific" and bool(settings.CALENDARIFIC_API_KEY)
+
+def default_years(today: Optional[date] = None) -> List[int]:
+    year = (today or date.today()).year
+    return list(range(year - settings.HOLIDAY_SYNC_YEARS_BACK, year + settings.HOLIDAY_SYNC_YEARS_AHEAD + 1))
+
+def sync_targets(db: Session, years: Iterable[int]) -> List[CountryYear]:
+    """
+    Every (country, year) pair for the countries our users live in
+    """
+    countries = {row[0] or "US" for row in db.query(models.User.country_code).distinct().all()}
+    return [(country, year) for country in sorted(countries) for year in years]
+
+def missing_targets(db: Session, targets: Iterable[CountryYear], now: Optional[datetime] = None) -> List[CountryYear]:
+    """
+    Targets never fetched successfully whose backoff (if any) has elapsed
+    """
+    targets = list(targets)
+    if not targets:
+        return []
+    now = now or datetime.utcnow()
+    logs = {
+        (row.country_code, row.year): row
+        for row in db.query(models.HolidayFetchLog).filter(
+            models.HolidayFetchLog.country_code.in_({country for country, _ in targets}),
+            models.HolidayFetchLog.year.in_({year for _, year in targets})
+        ).all()
+    }
+    due = []
+    for target in targets:
+        log = logs.get(target)
+        if log is None:
+            due.append(target)
+        elif log.status != "ok" and (log.next_retry_at is None or log.next_retry_at <= now):
+            due.append(target)
+    return due
+
+def backoff_delay(attempts: int) -> timedelta:
+    seconds = settings.HOLIDAY_FETCH_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.HOLIDAY_FETCH_BACKOFF_MAX_SECONDS))
+
+def _retry_schedule(new_attempts, now: datetime):
+    # backoff_delay doubles up to a cap, so a CASE over the uncapped steps
+    # computes next_retry_at from the incremented count in the same UPDATE
+    steps = {}
+    attempts = 1
+    cap = timedelta(seconds=settings.HOLIDAY_FETCH_BACKOFF_MAX_SECONDS)
+    while attempts <= 32 and backoff_delay(attempts) < cap:
+        steps[attempts] = now + backoff_delay(attempts)
+        attempts += 1
+    if not steps:
+        return now + cap
+    return case(steps, value=new_attempts, else_=now + cap)
+
+def record_fetch(db: Session, country_code: str, year: int, status: str, fetched_count: int) -> models.HolidayFetchLog:
+    """
+    Update the fetch log for a country/year, scheduling the next retry on failure.
+    Concurrent syncs of one target each get a row to update instead of racing
+    to insert it.
+    """
+    now = datetime.utcnow()
+    table = models.HolidayFetchLog.__table__
+    db_upsert.insert_on_conflict(
+        db,
+        table,
+        [{"country_code": country_code, "year": year, "status": status, "attempts": 0, "fetched_count": 0}],
+        ["country_code", "year"]
+    )
+    values = {"status": status, "fetched_count": fetched_count, "last_attempt_at": now}
+    if status == "ok":
+        values.update(attempts=0, next_retry_at=None)
+    else:
+        new_attempts = func.coalesce(table.c.attempts, 0) + 1
+        values.update(attempts=new_attempts, next_retry_at=_retry_schedule(new_attempts, now))
+    db.execute(table.update().where(
+        table.c.country_code == country_code,
+        table.c.year == year
+    ).values(**values))
+    db.commit()
+    return db.query(models.HolidayFetchLog).filter(
+        models.HolidayFetchLog.country_code == country_code,
+        models.HolidayFetchLog.year == year
+    ).one()
+
+def store_fetched_holidays(db: Session, country_code: str, year: int, fetched: List[Dict[str, Any]]) -> int:
+    """
+    Insert fetched holidays that are not already present for that country/year
+    """
+    if not fetched:
+        return 0
+    existing_keys = {
+        (row[0], row[1], row[2])
+        for row in db.query(
+            models.HolidayEvent.name,
+            models.HolidayEvent.date,
+            models.HolidayEvent.country_code
+        ).filter(
+            models.HolidayEvent.country_code == country_code,
+            models.HolidayEvent.date >= date(year, 1, 1),
+            models.HolidayEvent.date <= date(year, 12, 31)
+        ).all()
+    }
+    records = []
+    for item in fetched:
+        key = (item["name"], item["date"], item["country_code"])
+        if key in existing_keys:
+            continue
+        existing_keys.add(key)
+        records.append({
+            "name": item["name"],
+            "date": item["date"],
+            "country_code": item["country_code"],
+            "type": item["type"],
+            "tags": json.dumps(item.get("tags", [])),
+            "source": item.get("source", "calendarific"),
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        })
+    if not records:
+        return 0
+    # The unique key settles any insert that raced past the existence check
+    inserted = db_upsert.insert_on_conflict(
+        db,
+        models.HolidayEvent.__table__,
+        records,
+        ["country_code", "date", "name"]
+    )
+    db.commit()
+    return inserted
+
+class HolidaySync:
+    """
+    Prefetches country/year calendars from the holiday provider with a pool of
+    fetcher threads, each holding its own keep-alive connection. Fetching runs
+    concurrently; inserts happen on the coordinating thread with one session.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.HOLIDAY_SYNC_WORKERS,
+        interval_seconds: int = settings.HOLIDAY_SYNC_INTERVAL_SECONDS,
+        base_url: Optional[str] = None
+    ):
+        self.max_workers = max(1, max_workers)
+        self.interval_seconds = interval_seconds
+        self.base_url = base_url
+        self.last_stats: Optional[Dict[str, Any]] = None
+        # Queued by request() / being synced by any thread; both guarded by one lock
+        self._pending: Set[CountryYear] = set()
+        self._in_flight: Set[CountryYear] = set()
+        self._pending_lock = threading.Lock()
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="holiday-sync-request")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fetch_all(self, targets: List[CountryYear]):
+        """
+        Yield (target, status, holidays, seconds) as fetcher threads complete
+        """
+        local = threading.local()
+        clients: List[CalendarificClient] = []
+        clients_lock = threading.Lock()
+
+        def fetch(target: CountryYear):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = CalendarificClient(base_url=self.base_url)
+                local.client = client
+                with clients_lock:
+                    clients.append(client)
+            started = time.perf_counter()
+            status, fetched = client.fetch(*target)
+            return target, status, fetched, time.perf_counter() - started
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)), thread_name_prefix="holiday-fetch") as pool:
+                futures = [pool.submit(fetch, target) for target in targets]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            for client in clients:
+                client.close()
+
+    def _claim(self, targets: Iterable[CountryYear]) -> List[CountryYear]:
+        """
+        Mark targets as in flight, skipping those another thread is already syncing
+        """
+        with self._pending_lock:
+            claimed = [target for target in dict.fromkeys(targets) if target not in self._in_flight]
+            self._in_flight.update(claimed)
+        return claimed
+
+    def sync(self, db: Session, targets: Iterable[CountryYear]) -> Dict[str, Any]:
+        """
+        Fetch and store the given targets that are due according to the fetch log
+        """
+        started = time.perf_counter()
+        claimed = self._claim(targets) if provider_enabled() else []
+        inserted = 0
+        failed = 0
+        fetch_seconds = 0.0
+        try:
+            # Checked after claiming, so a sync that just finished these targets is seen
+            todo = missing_targets(db, claimed)
+            if todo:
+                for (country_code, year), status, fetched, elapsed in self._fetch_all(todo):
+                    fetch_seconds += elapsed
+                    if status != "ok":
+                        failed += 1
+                    inserted += store_fetched_holidays(db, country_code, year, fetched)
+                    record_fetch(db, country_code, year, status, len(fetched))
+        finally:
+            with self._pending_lock:
+                self._in_flight.difference_update(claimed)
+        if inserted:
+            holiday_calendar.rebuild(db)
+
+        stats = {
+            "targets": len(todo),
+            "failed": failed,
+            "inserted": inserted,
+            "fetch_seconds": round(fetch_seconds, 4),
+            "duration_seconds": round(time.perf_counter() - started, 4)
+        }
+        self.last_stats = stats
+        return stats
+
+    def run_once(self, years: Optional[List[int]] = None) -> Dict[str, Any]:
+        with SessionLocal() as db:
+            stats = self.sync(db, sync_targets(db, years or default_years()))
+        logger.info("Holiday sync pass: %s", stats)
+        return stats
+
+    def request(self, db: Session, country_code: str, start_date: date, end_date: date) -> int:
+        """
+        Queue a background fetch for any missing years in the range; never blocks.
+        Off with HOLIDAY_SYNC_ENABLED, like the periodic prefetch.
+        """
+        if not (settings.HOLIDAY_SYNC_ENABLED and provider_enabled()):
+            return 0
+        targets = [(country_code, year) for year in range(start_date.year, end_date.year + 1)]
+        with self._pending_lock:
+            todo = [
+                target for target in missing_targets(db, targets)
+                if target not in self._pending and target not in self._in_flight
+            ]
+            self._pending.update(todo)
+        if todo:
+            self._background.submit(self._run_requested, todo)
+        return len(todo)
+
+    def _run_requested(self, targets: List[CountryYear]) -> None:
+        try:
+            with SessionLocal() as db:
+                self.sync(db, targets)
+        except Exception:
+            logger.exception("Requested holiday sync failed for %s", targets)
+        finally:
+            with self._pending_lock:
+                self._pending.difference_update(targets)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Holiday sync pass failed")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="holiday-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+holiday_sync = HolidaySync()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prefetch holiday calendars for every user country")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--workers", type=int, default=settings.HOLIDAY_SYNC_WORKERS)
+    parser.add_argument("--interval", type=int, default=settings.HOLIDAY_SYNC_INTERVAL_SECONDS)
+    parser.add_argument("--base-url", default=None, help="override the provider base URL")
+    parser.add_argument("--year", type=int, action="append", dest="years", help="sync only these years")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    syncer = HolidaySync(max_workers=args.workers, interval_seconds=args.interval, base_url=args.base_url)
+    if args.once:
+        syncer.run_once(args.years)
+        return 0
+    try:
+        syncer._loop()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
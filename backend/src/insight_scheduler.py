@@ -0,0 +1,253 @@
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models, crud
+from .core.config import settings
+from .database import SessionLocal, engine
+from .holiday_calendar import holiday_calendar
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY = "insight_scheduler_lease"
+
+def acquire_lease(db: Session, owner: str, ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+    """
+    Claim or renew the lease row that elects a single scheduler across all
+    app workers. A lease its holder stopped renewing for ttl_seconds is taken over.
+    """
+    now = now or datetime.utcnow()
+    table = models.AppStamp.__table__
+    claimed = db.execute(table.update().where(
+        table.c.key == LEASE_KEY,
+        or_(table.c.value == owner, table.c.updated_at < now - timedelta(seconds=ttl_seconds))
+    ).values(value=owner, updated_at=now)).rowcount
+    if not claimed:
+        try:
+            db.execute(table.insert().values(key=LEASE_KEY, value=owner, updated_at=now))
+        except IntegrityError:
+            # Someone else holds a live lease
+            db.rollback()
+            return False
+    db.commit()
+    return True
+
+def release_lease(db: Session, owner: str) -> None:
+    table = models.AppStamp.__table__
+    db.execute(table.delete().where(table.c.key == LEASE_KEY, table.c.value == owner))
+    db.commit()
+
+def _init_process_worker() -> None:
+    # A forked worker inherits the parent's pooled connections; drop them
+    # without closing so the parent's connections stay usable
+    engine.dispose(close=False)
+
+def find_stale_users(db: Session, window_days: int) -> List[int]:
+    """
+    Return opted-in users with an upcoming event that has no fresh cached insight
+    """
+    today = date.today()
+    window_end = today + timedelta(days=window_days)
+    now = datetime.utcnow()
+
+    opted_in = or_(models.User.calendar_opt_in.is_(None), models.User.calendar_opt_in.is_(True))
+    country = func.coalesce(models.User.country_code, "US")
+
+    upcoming_by_country = {}
+    for (country_code,) in db.query(country).filter(opted_in).distinct().all():
+        events = holiday_calendar.for_country(db, country_code).between(today, window_end)
+        if events:
+            upcoming_by_country[country_code] = events
+    if not upcoming_by_country:
+        return []
+    upcoming_ids = [event.id for events in upcoming_by_country.values() for event in events]
+
+    # Only the fresh rows for upcoming events matter, and only the users whose
+    # country has one; the cost follows upcoming events, not the user table
+    fresh = {
+        (row[0], row[1], row[2])
+        for row in db.query(
+            models.HolidayInsight.user_id,
+            models.HolidayInsight.holiday_event_id,
+            models.HolidayInsight.window_start
+        ).filter(
+            models.HolidayInsight.holiday_event_id.in_(upcoming_ids),
+            models.HolidayInsight.expires_at > now
+        ).all()
+    }
+    users = db.query(models.User.id, country.label("country_code"), models.User.culture_tags).filter(
+        opted_in,
+        country.in_(list(upcoming_by_country))
+    ).all()
+
+    stale = []
+    for user in users:
+        candidates = crud.filter_events_for_user(user, upcoming_by_country[user.country_code])
+        if any((user.id, event.id, crud.holiday_window(event.date)[0]) not in fresh for event in candidates):
+            stale.append(user.id)
+    return stale
+
+def refresh_user_insights(user_id: int, window_days: int) -> Tuple[int, float, int]:
+    """
+    Recompute one user's insights on a private session; safe to run in a pool worker
+    """
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if user is None:
+            return user_id, time.perf_counter() - started, 0
+        insights = crud.get_holiday_insights(db, user, window_days=window_days)
+    return user_id, time.perf_counter() - started, len(insights)
+
+class InsightScheduler:
+    """
+    Periodically precomputes holiday insights so requests hit a warm cache.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.INSIGHT_SCHEDULER_WORKERS,
+        interval_seconds: int = settings.INSIGHT_SCHEDULER_INTERVAL_SECONDS,
+        window_days: int = settings.INSIGHT_WINDOW_DAYS,
+        executor: str = settings.INSIGHT_SCHEDULER_EXECUTOR,
+        lease_seconds: Optional[float] = None
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown insight scheduler executor: {executor}")
+        self.max_workers = max(1, max_workers)
+        self.interval_seconds = interval_seconds
+        self.window_days = window_days
+        self.executor = executor
+        # Renewed every pass, so it must outlive one interval plus a slow pass
+        self.lease_seconds = lease_seconds or interval_seconds * 2
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.last_stats: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _make_executor(self) -> Executor:
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_process_worker)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="insights")
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run a single synchronous pass and return its timing stats
+        """
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            compaction = crud.compact_holiday_insights(db)
+            user_ids = find_stale_users(db, self.window_days)
+
+        timings: List[float] = []
+        insights_generated = 0
+        failures = 0
+        if user_ids:
+            with self._make_executor() as pool:
+                futures = {
+                    pool.submit(refresh_user_insights, user_id, self.window_days): user_id
+                    for user_id in user_ids
+                }
+                for future in as_completed(futures):
+                    try:
+                        _, elapsed, count = future.result()
+                    except Exception:
+                        failures += 1
+                        logger.exception("Insight refresh failed for user %s", futures[future])
+                        continue
+                    timings.append(elapsed)
+                    insights_generated += count
+
+        stats = {
+            "users_stale": len(user_ids),
+            "users_refreshed": len(timings),
+            "failures": failures,
+            "insights_generated": insights_generated,
+            "duration_seconds": round(time.perf_counter() - started, 4),
+            "max_user_seconds": round(max(timings), 4) if timings else 0.0,
+            "avg_user_seconds": round(sum(timings) / len(timings), 4) if timings else 0.0,
+            "compacted_rows": compaction["rows_deleted"],
+            "compacted_bytes": compaction["bytes_reclaimed"]
+        }
+        self.last_stats = stats
+        logger.info("Insight precompute pass: %s", stats)
+        return stats
+
+    def run_if_leader(self) -> Optional[Dict[str, Any]]:
+        """
+        Run a pass only if this process holds (or can claim) the scheduler lease
+        """
+        with SessionLocal() as db:
+            if not acquire_lease(db, self.owner, self.lease_seconds):
+                logger.debug("Insight precompute skipped; another worker holds the lease")
+                return None
+        return self.run_once()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_if_leader()
+            except Exception:
+                logger.exception("Insight precompute pass failed")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="insight-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+            with SessionLocal() as db:
+                release_lease(db, self.owner)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute holiday insights for opted-in users")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--compact", action="store_true", help="only evict expired/past insights and exit")
+    parser.add_argument("--workers", type=int, default=settings.INSIGHT_SCHEDULER_WORKERS)
+    parser.add_argument("--executor", choices=["thread", "process"], default=settings.INSIGHT_SCHEDULER_EXECUTOR)
+    parser.add_argument("--interval", type=int, default=settings.INSIGHT_SCHEDULER_INTERVAL_SECONDS)
+    parser.add_argument("--window-days", type=int, default=settings.INSIGHT_WINDOW_DAYS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.compact:
+        with SessionLocal() as db:
+            result = crud.compact_holiday_insights(db)
+        logger.info("Compacted holiday insights: %s", result)
+        return 0
+    scheduler = InsightScheduler(
+        max_workers=args.workers,
+        interval_seconds=args.interval,
+        window_days=args.window_days,
+        executor=args.executor
+    )
+    if args.once:
+        scheduler.run_once()
+        return 0
+    try:
+        scheduler._loop()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,57 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
+import anyio
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date
 from typing import List, Optional
 import logging
+import secrets
 import sys
 import bcrypt
 
-from . import models, schemas, crud
-from .database import SessionLocal, engine
-from .core.security import create_access_token, verify_password, get_password_hash
+from . import models, schemas, crud, conditional, dashboard, fast_json, transaction_export, transaction_import
+from .database import ReadSessionLocal, SessionLocal, engine, read_engine
+from .db_profiles import log_engine_settings
+from .metrics import MetricsMiddleware, metrics
+from .core.security import create_access_token
+from .core.password_hashing import password_hasher
 from .core.config import settings
-from .db_migrations import ensure_schema
-from .holiday_seed import seed_holidays_missing
+from .bootstrap import bootstrap_database
+from .insight_scheduler import InsightScheduler
+from .holiday_calendar import CalendarEvent, holiday_calendar
+from .holiday_sync import holiday_sync, provider_enabled
+from .user_cache import user_cache
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-models.Base.metadata.create_all(bind=engine)
-
 app = FastAPI(title="Expense Tracker API", version="1.0.0")
+insight_scheduler = InsightScheduler()
 
 @app.on_event("startup")
 def log_runtime_env():
     logger.info("Python executable: %s", sys.executable)
     logger.info("bcrypt version: %s", getattr(bcrypt, "__version__", "unknown"))
-    ensure_schema()
+    log_engine_settings(engine)
+    if read_engine is not engine:
+        log_engine_settings(read_engine)
+    bootstrap_database()
     with SessionLocal() as db:
-        seed_holidays_missing(db)
+        holiday_calendar.warm(db)
+    if settings.HOLIDAY_SYNC_ENABLED and provider_enabled():
+        holiday_sync.start()
+    if settings.INSIGHT_SCHEDULER_ENABLED:
+        insight_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    insight_scheduler.stop(timeout=5)
+    holiday_sync.stop(timeout=5)
+    password_hasher.shutdown()
 
 # Configure CORS
 app.add_middleware(
@@ -37,7 +60,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
+)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    compresslevel=settings.COMPRESSION_LEVEL
 )
+# Outermost, so latency covers compression and the full streamed body
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine, "primary")
+    if read_engine is not engine:
+        metrics.instrument_engine(read_engine, "read")
+    app.add_middleware(MetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_LOG_MS)
 
 # Dependency to get DB session
 def get_db():
@@ -47,6 +82,14 @@ def get_db():
     finally:
         db.close()
 
+# Dependency for GET routes that only read; backed by the read-only pool
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 # Root endpoint
@@ -54,20 +97,58 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 def root():
     return {"message": "Welcome to Expense Tracker API"}
 
+def _auth_metrics():
+    cache = user_cache.stats()
+    hashing = password_hasher.stats()
+    return [
+        ("auth_identity_cache_entries", "gauge", "Identities held in the auth cache", cache["size"]),
+        ("auth_identity_cache_hits_total", "counter", "Token lookups served from the auth cache", cache["hits"]),
+        ("auth_identity_cache_misses_total", "counter", "Token lookups that went to the database", cache["misses"]),
+        ("auth_identity_cache_evictions_total", "counter", "Identities evicted from the auth cache", cache["evictions"]),
+        ("password_hash_in_flight", "gauge", "bcrypt jobs queued or running", hashing["in_flight"]),
+        ("password_hash_queue_depth", "gauge", "bcrypt jobs waiting for a worker", hashing["queue_depth"]),
+        ("password_hash_completed_total", "counter", "bcrypt jobs finished", hashing["completed"]),
+        ("password_hash_rejected_total", "counter", "bcrypt jobs rejected with 503", hashing["rejected"]),
+    ]
+
+metrics.add_collector(_auth_metrics)
+
+# Prometheus scrape endpoint, off unless METRICS_ENABLED; set METRICS_TOKEN to require a bearer token
+@app.get("/metrics", include_in_schema=False)
+def read_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not secrets.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _with_session(fn, *args):
+    """
+    Run a sync DB helper on its own session; used from async routes via the threadpool
+    """
+    with SessionLocal() as db:
+        return fn(db, *args)
+
 # Authentication Routes
 @app.post("/api/auth/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate):
     try:
         # Validate password length (bcrypt has a 72 byte limit)
         if len(user.password.encode('utf-8')) > 72:
             raise HTTPException(status_code=400, detail="Password is too long. Maximum 72 bytes allowed.")
         
-        db_user = crud.get_user_by_email(db, email=user.email)
+        db_user = await run_in_threadpool(_with_session, crud.get_user_by_email, user.email)
         if db_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        hashed_password = get_password_hash(user.password)
-        db_user = crud.create_user(db=db, user=user, hashed_password=hashed_password)
+        hashed_password = await password_hasher.hash(user.password)
+        db_user = await run_in_threadpool(_with_session, crud.create_user, user, hashed_password)
         return db_user
     except HTTPException:
         raise
@@ -75,21 +156,46 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         logger.error(f"Registration error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
-@app.post("/api/auth/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
-    
+def _token_response(user, refresh_token: str) -> dict:
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(access_token_expires.total_seconds())
+    }
+
+@app.post("/api/auth/login", response_model=schemas.TokenResponse)
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await run_in_threadpool(_with_session, crud.get_user_by_email, form_data.username)
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await run_in_threadpool(_with_session, crud.create_refresh_token, user.id)
+    return _token_response(user, refresh_token)
+
+@app.post("/api/auth/refresh", response_model=schemas.TokenResponse)
+def refresh_access_token(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    rotated = crud.rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
+    return _token_response(user, refresh_token)
+
+@app.post("/api/auth/logout")
+def logout(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    crud.revoke_refresh_token(db, request.refresh_token)
+    return {"message": "Logged out successfully"}
 
 @app.get("/api/auth/me", response_model=schemas.UserResponse)
-def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -97,14 +203,9 @@ def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get
     )
     
     try:
-        payload = crud.decode_token(token)
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        user = crud.get_current_user(token, db)
     except:
         raise credentials_exception
-    
-    user = crud.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
     
@@ -125,12 +226,19 @@ def update_user_preferences(
         )
     return crud.update_user_preferences(db, user, prefs)
 
+# The holidays fast path serialises CalendarEvent tuples directly, so they must
+# carry exactly the response schema's fields
+if set(CalendarEvent._fields) != set(schemas.HolidayEventResponse.__fields__):
+    raise RuntimeError("CalendarEvent fields no longer match HolidayEventResponse")
+
 @app.get("/api/holidays", response_model=List[schemas.HolidayEventResponse])
 def read_holidays(
+    request: Request,
+    response: Response,
     country: Optional[str] = None,
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
@@ -143,7 +251,22 @@ def read_holidays(
     country_code = country or user.country_code or "US"
     start = from_date or date.today().replace(day=1)
     end = to_date or (start + timedelta(days=31))
-    return crud.get_holidays(db, country_code, start, end)
+    # Holidays are shared reference data; tag them by the content of the
+    # calendar snapshot, so a revalidation is answered before any events load
+    calendar = holiday_calendar.for_country(db, country_code)
+    etag = conditional.content_etag(request, calendar.fingerprint)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    crud.ensure_holidays_for_range(db, country_code, start, end)
+    events = calendar.between(start, end)
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json.rows_response(
+            [event._replace(tags=schemas.parse_tags(event.tags)) for event in events],
+            CalendarEvent._fields,
+            conditional.cache_headers(etag)
+        )
+    response.headers.update(conditional.cache_headers(etag))
+    return events
 
 @app.get("/api/insights/holidays", response_model=List[schemas.HolidayInsightResponse])
 def read_holiday_insights(
@@ -163,16 +286,105 @@ def read_holiday_insights(
         return []
     return crud.get_holiday_insights(db, user, window_days=window_days, force=force)
 
+@app.get("/api/dashboard", response_model=schemas.DashboardResponse)
+async def read_dashboard(
+    response: Response,
+    country: Optional[str] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    window_days: int = 30,
+    recent_limit: int = Query(5, ge=1, le=100),
+    token: str = Depends(oauth2_scheme)
+):
+    user = await run_in_threadpool(_with_session, lambda db: crud.get_current_user(token, db))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    country_code = country or user.country_code or "US"
+    start = from_date or date.today().replace(day=1)
+    end = to_date or (start + timedelta(days=31))
+    payload, timings = await dashboard.build_dashboard(user, country_code, start, end, window_days, recent_limit)
+    response.headers["Server-Timing"] = dashboard.server_timing_header(timings)
+    return payload
+
 # Transaction Routes
 @app.get("/api/transactions", response_model=List[schemas.TransactionResponse])
 def read_transactions(
+    request: Request,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
-    return crud.get_transactions(db, user_id=user.id, skip=skip, limit=limit)
+    etag = conditional.user_etag(request, user.id, crud.get_data_version(db, user.id))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    filters = schemas.TransactionFilters(
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category=category,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        search=search
+    )
+    try:
+        transactions, next_cursor = crud.get_transactions(
+            db, user_id=user.id, limit=limit, cursor=cursor, filters=filters, skip=skip,
+            as_tuples=settings.FAST_JSON_RESPONSES
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = conditional.cache_headers(etag)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json.rows_response(transactions, list(schemas.TransactionResponse.__fields__), headers)
+    response.headers.update(headers)
+    return transactions
+
+@app.get("/api/transactions/export")
+def export_transactions(
+    format: str = "csv",
+    dataset: str = "transactions",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if format not in transaction_export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(transaction_export.EXPORT_FORMATS)}")
+    if dataset not in transaction_export.EXPORT_DATASETS:
+        raise HTTPException(status_code=400, detail=f"dataset must be one of: {', '.join(transaction_export.EXPORT_DATASETS)}")
+    filters = schemas.TransactionFilters(date_from=date_from, date_to=date_to, type=type, category=category)
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        transaction_export.stream_export(user.id, format, dataset, filters),
+        media_type=transaction_export.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{extension}"'}
+    )
 
 @app.post("/api/transactions", response_model=schemas.TransactionResponse)
 def create_transaction(
@@ -183,10 +395,66 @@ def create_transaction(
     user = crud.get_current_user(token, db)
     return crud.create_transaction(db=db, transaction=transaction, user_id=user.id)
 
+def _iter_request_chunks(request: Request):
+    """
+    Pull the request body chunk by chunk from a threadpool worker
+    """
+    stream = request.stream().__aiter__()
+    while True:
+        try:
+            chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
+
+def _import_request(request: Request, user_id: int, file_format: str) -> dict:
+    with SessionLocal() as db:
+        return transaction_import.import_transactions(db, user_id, _iter_request_chunks(request), file_format)
+
+@app.post("/api/transactions/import", response_model=schemas.TransactionImportResult)
+async def import_transactions(
+    request: Request,
+    format: Optional[str] = None,
+    token: str = Depends(oauth2_scheme)
+):
+    user = await run_in_threadpool(_with_session, lambda db: crud.get_current_user(token, db))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    file_format = format or transaction_import.format_from_content_type(request.headers.get("content-type"))
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Specify format=csv or format=ndjson")
+    try:
+        return await run_in_threadpool(_import_request, request, user.id, file_format)
+    except transaction_import.ImportFormatError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+@app.post("/api/transactions/batch/update", response_model=schemas.BatchResult)
+def batch_update_transactions(
+    batch: schemas.TransactionBatchUpdate,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    return {"affected": crud.batch_update_transactions(db, user_id=user.id, selection=batch)}
+
+@app.post("/api/transactions/batch/delete", response_model=schemas.BatchResult)
+def batch_delete_transactions(
+    batch: schemas.TransactionBatchSelection,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    return {"affected": crud.batch_delete_transactions(db, user_id=user.id, selection=batch)}
+
 @app.get("/api/transactions/{transaction_id}", response_model=schemas.TransactionResponse)
 def read_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
@@ -226,14 +494,31 @@ def delete_transaction(
 # Budget Routes
 @app.get("/api/budgets", response_model=List[schemas.BudgetResponse])
 def read_budgets(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
+    etag = conditional.user_etag(request, user.id, crud.get_data_version(db, user.id))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    if settings.FAST_JSON_RESPONSES:
+        budgets = crud.get_budgets(db, user_id=user.id, skip=skip, limit=limit, as_tuples=True)
+        return fast_json.rows_response(budgets, list(schemas.BudgetResponse.__fields__), conditional.cache_headers(etag))
+    response.headers.update(conditional.cache_headers(etag))
     return crud.get_budgets(db, user_id=user.id, skip=skip, limit=limit)
 
+@app.get("/api/budgets/progress", response_model=List[schemas.BudgetProgress])
+def read_budget_progress(
+    db: Session = Depends(get_read_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    return crud.get_budget_progress(db, user_id=user.id)
+
 @app.post("/api/budgets", response_model=schemas.BudgetResponse)
 def create_budget(
     budget: schemas.BudgetCreate,
@@ -243,10 +528,28 @@ def create_budget(
     user = crud.get_current_user(token, db)
     return crud.create_budget(db=db, budget=budget, user_id=user.id)
 
+@app.post("/api/budgets/batch/update", response_model=schemas.BatchResult)
+def batch_update_budgets(
+    batch: schemas.BudgetBatchUpdate,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    return {"affected": crud.batch_update_budgets(db, user_id=user.id, batch=batch)}
+
+@app.post("/api/budgets/batch/delete", response_model=schemas.BatchResult)
+def batch_delete_budgets(
+    batch: schemas.BudgetBatchDelete,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    user = crud.get_current_user(token, db)
+    return {"affected": crud.batch_delete_budgets(db, user_id=user.id, batch=batch)}
+
 @app.get("/api/budgets/{budget_id}", response_model=schemas.BudgetResponse)
 def read_budget(
     budget_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
@@ -286,8 +589,14 @@ def delete_budget(
 # Statistics Routes
 @app.get("/api/stats/transactions", response_model=schemas.TransactionStats)
 def get_transaction_stats(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     token: str = Depends(oauth2_scheme)
 ):
     user = crud.get_current_user(token, db)
+    etag = conditional.user_etag(request, user.id, crud.get_data_version(db, user.id))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    response.headers.update(conditional.cache_headers(etag))
     return crud.get_transaction_stats(db, user_id=user.id)
@@ -0,0 +1,289 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Cap what a slow-request log line can carry; the counters still see every statement
+MAX_LOGGED_STATEMENTS = 50
+MAX_STATEMENT_CHARS = 300
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by a label tuple, in Prometheus layout
+    """
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        # Layout: one count per bucket, then +Inf count, then sum
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_number(bound)
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{le}"}} {int(cumulative)}')
+            lines.append(f"{self.name}_sum{{{base}}} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{{{base}}} {int(cumulative)}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {_format_number(value)}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class RequestStats:
+    """
+    Database work attributed to one HTTP request. Shared by every thread the
+    request fans out to (contextvars are copied into the threadpool), so
+    updates take a lock.
+    """
+    def __init__(self, keep_statements: bool):
+        self.statement_count = 0
+        self.sql_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.statements: Optional[List[Tuple[float, str]]] = [] if keep_statements else None
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.statement_count += 1
+            self.sql_seconds += elapsed
+            if self.statements is not None and len(self.statements) < MAX_LOGGED_STATEMENTS:
+                self.statements.append((elapsed, " ".join(statement.split())[:MAX_STATEMENT_CHARS]))
+
+    def record_pool_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.pool_wait_seconds += elapsed
+
+# (name, "gauge" or "counter", help text, value) read at scrape time
+Sample = Tuple[str, str, str, float]
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("metrics_current_request", default=None)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, Engine] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self.requests = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+        self.request_seconds = Histogram(
+            "http_request_duration_seconds", "Request latency until the last body chunk", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.request_statements = Histogram(
+            "http_request_sql_statements", "SQL statements executed per request", ("method", "route"), STATEMENT_COUNT_BUCKETS
+        )
+        self.request_sql_seconds = Histogram(
+            "http_request_sql_seconds", "Total SQL execution time per request", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.statements = Counter("db_statements_total", "SQL statements executed, including background jobs", ("engine",))
+        self.statement_seconds = Counter("db_statement_seconds_total", "Time spent executing SQL statements", ("engine",))
+        self.pool_wait = Histogram(
+            "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("engine",), POOL_WAIT_BUCKETS
+        )
+        self.pool_timeouts = Counter("db_pool_checkout_timeouts_total", "Connection checkouts that hit the pool timeout", ("engine",))
+
+    def instrument_engine(self, engine: Engine, name: str) -> None:
+        """
+        Time every cursor execution and pool checkout on this engine. Safe to
+        call more than once; an engine is only hooked the first time.
+        """
+        if name in self._engines:
+            return
+        self._engines[name] = engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._metrics_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_metrics_started", None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.statements.inc((name,))
+                self.statement_seconds.inc((name,), elapsed)
+            stats = _current_request.get()
+            if stats is not None:
+                stats.record_statement(statement, elapsed)
+
+        self._instrument_pool(engine.pool, name)
+
+        # dispose() swaps in a fresh, unwrapped pool, so wrap each replacement too
+        @event.listens_for(engine, "engine_disposed")
+        def _engine_disposed(disposed):
+            self._instrument_pool(disposed.pool, name)
+
+    def _instrument_pool(self, pool, name: str) -> None:
+        # The pool has no "before checkout" event, so time the engine's call into it
+        connect = pool.connect
+
+        def _timed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            except PoolTimeoutError:
+                with self._lock:
+                    self.pool_timeouts.inc((name,))
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.pool_wait.observe((name,), elapsed)
+                stats = _current_request.get()
+                if stats is not None:
+                    stats.record_pool_wait(elapsed)
+
+        pool.connect = _timed_connect
+
+    def observe_request(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.request_seconds.observe(labels, elapsed)
+            self.request_statements.observe(labels, stats.statement_count)
+            self.request_sql_seconds.observe(labels, stats.sql_seconds)
+
+    def add_collector(self, collect: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Register a callable whose samples are read fresh on every scrape
+        """
+        self._collectors.append(collect)
+
+    def _collected(self) -> List[str]:
+        lines = []
+        for collect in self._collectors:
+            for name, kind, help_text, value in collect():
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {_format_number(value)}"])
+        return lines
+
+    def _pool_gauges(self) -> List[str]:
+        lines = [
+            "# HELP db_pool_checked_out Connections currently checked out of the pool",
+            "# TYPE db_pool_checked_out gauge",
+        ]
+        for name, engine in sorted(self._engines.items()):
+            # StaticPool and NullPool do not track checkouts
+            checkedout = getattr(engine.pool, "checkedout", None)
+            if checkedout is not None:
+                lines.append(f'db_pool_checked_out{{engine="{name}"}} {checkedout()}')
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (
+                self.requests,
+                self.request_seconds,
+                self.request_statements,
+                self.request_sql_seconds,
+                self.statements,
+                self.statement_seconds,
+                self.pool_wait,
+                self.pool_timeouts,
+            ):
+                lines.extend(metric.render())
+            lines.extend(self._pool_gauges())
+        lines.extend(self._collected())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+def _route_label(scope) -> str:
+    # Label by route template so path parameters cannot explode the series count
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+def _log_slow_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    logger.warning(
+        "Slow request %s %s -> %s in %.1f ms (%d statements, %.1f ms SQL, %.1f ms pool wait)",
+        method, route, status, elapsed * 1000, stats.statement_count,
+        stats.sql_seconds * 1000, stats.pool_wait_seconds * 1000
+    )
+    for statement_elapsed, statement in stats.statements or []:
+        logger.warning("  %.1f ms  %s", statement_elapsed * 1000, statement)
+    if stats.statement_count > len(stats.statements or []):
+        logger.warning("  ... %d more statements not shown", stats.statement_count - len(stats.statements or []))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that attributes latency and database work to each route.
+    Latency runs until the last body chunk, so streamed responses count in full.
+    """
+    def __init__(self, app, slow_request_ms: Optional[int] = None):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(keep_statements=self.slow_request_ms is not None)
+        token = _current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            elapsed = time.perf_counter() - started
+            method = scope["method"]
+            route = _route_label(scope)
+            metrics.observe_request(method, route, status, elapsed, stats)
+            if self.slow_request_ms is not None and elapsed * 1000 >= self.slow_request_ms:
+                _log_slow_request(method, route, status, elapsed, stats)
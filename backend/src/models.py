@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey, Text, Index
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,12 +15,28 @@ class User(Base):
     timezone = Column(String, default="UTC")
     culture_tags = Column(Text, default="[]")
     calendar_opt_in = Column(Boolean, default=True)
+    # Bumped by every transaction or budget write; feeds the ETags of read endpoints
+    data_version = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     transactions = relationship("Transaction", back_populates="owner")
     budgets = relationship("Budget", back_populates="owner")
     holiday_insights = relationship("HolidayInsight", back_populates="user")
+    refresh_tokens = relationship("RefreshToken", back_populates="user")
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String, nullable=False, unique=True, index=True)
+    family_id = Column(String, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User", back_populates="refresh_tokens")
 
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -37,6 +53,27 @@ class Transaction(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_transactions_user_date", "user_id", "date"),
+        # amount is trailing so the expense series query is answered from the index alone
+        Index("ix_transactions_user_type_date_category", "user_id", "type", "date", "category", "amount"),
+    )
+
+class TransactionRollup(Base):
+    __tablename__ = "transaction_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(String, nullable=False)  # YYYY-MM
+    category = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category", "type", name="uq_transaction_rollups_key"),
+    )
+
 class Budget(Base):
     __tablename__ = "budgets"
 
@@ -50,6 +87,10 @@ class Budget(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_budgets_user_id", "user_id"),
+    )
+
 class HolidayEvent(Base):
     __tablename__ = "holiday_events"
 
@@ -65,6 +106,7 @@ class HolidayEvent(Base):
 
     __table_args__ = (
         Index("ix_holiday_events_country_date", "country_code", "date"),
+        Index("uq_holiday_events_country_date_name", "country_code", "date", "name", unique=True),
     )
 
 class HolidayInsight(Base):
@@ -83,6 +125,7 @@ class HolidayInsight(Base):
     recommended_adjustment_pct = Column(Float, default=0.0)
     explanation = Column(Text, default="")
     status = Column(String, default="ok")
+    dependency_ranges_json = Column(Text, nullable=True)
     generated_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=True)
 
@@ -90,5 +133,28 @@ class HolidayInsight(Base):
     holiday_event = relationship("HolidayEvent")
 
     __table_args__ = (
-        Index("ix_holiday_insights_user_event_window", "user_id", "holiday_event_id", "window_start"),
+        Index("ix_holiday_insights_user_event_window", "user_id", "holiday_event_id", "window_start", unique=True),
+    )
+
+class HolidayFetchLog(Base):
+    __tablename__ = "holiday_fetch_log"
+
+    id = Column(Integer, primary_key=True, index=True)
+    country_code = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)  # ok, empty or error
+    attempts = Column(Integer, nullable=False, default=0)
+    fetched_count = Column(Integer, nullable=False, default=0)
+    last_attempt_at = Column(DateTime, nullable=True)
+    next_retry_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("country_code", "year", name="uq_holiday_fetch_log_country_year"),
     )
+
+class AppStamp(Base):
+    __tablename__ = "app_stamps"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
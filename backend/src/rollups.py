@@ -0,0 +1,199 @@
+import argparse
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import db_upsert, models
+
+RollupKey = Tuple[int, str, str, str]
+
+def month_key(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+def month_bucket(db: Session, column):
+    """
+    Build a dialect-specific "YYYY-MM" expression for grouping by month
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect in ("mysql", "mariadb"):
+        return func.date_format(column, "%Y-%m")
+    return func.strftime("%Y-%m", column)
+
+def apply_transaction_delta(db: Session, transaction: models.Transaction, sign: int) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) a transaction from its rollup bucket.
+    The change lands in the caller's DB transaction and is not committed.
+    """
+    apply_rollup_deltas(db, transaction.user_id, {
+        (month_key(transaction.date), transaction.category, transaction.type): (sign * transaction.amount, sign)
+    })
+
+def apply_rollup_deltas(db: Session, user_id: int, deltas: Dict[Tuple[str, str, str], Tuple[float, int]]) -> None:
+    """
+    Add pre-aggregated (month, category, type) -> (amount, count) deltas for one
+    user. The increments happen in SQL (insert, or add on conflict), so
+    concurrent writers to the same bucket cannot lose updates or collide on
+    the unique key. Runs in the caller's transaction, not committed.
+    """
+    if not deltas:
+        return
+    table = models.TransactionRollup.__table__
+    db_upsert.insert_on_conflict(
+        db,
+        table,
+        [
+            {
+                "user_id": user_id,
+                "month": month,
+                "category": category,
+                "type": tx_type,
+                "total_amount": amount,
+                "transaction_count": count
+            }
+            for (month, category, tx_type), (amount, count) in deltas.items()
+        ],
+        ["user_id", "month", "category", "type"],
+        lambda excluded: {
+            "total_amount": table.c.total_amount + excluded.total_amount,
+            "transaction_count": table.c.transaction_count + excluded.transaction_count
+        }
+    )
+    # Buckets emptied by this write (or inserted by a removal) are dropped
+    db.execute(table.delete().where(
+        table.c.user_id == user_id,
+        table.c.month.in_({key[0] for key in deltas}),
+        table.c.transaction_count <= 0
+    ))
+
+def get_user_rollups(db: Session, user_id: int) -> List[models.TransactionRollup]:
+    return db.query(models.TransactionRollup).filter(
+        models.TransactionRollup.user_id == user_id
+    ).order_by(models.TransactionRollup.month.asc()).all()
+
+def sum_category_month(db: Session, user_id: int, category: str, month: str, tx_type: str = "expense") -> float:
+    total = db.query(models.TransactionRollup.total_amount).filter(
+        models.TransactionRollup.user_id == user_id,
+        models.TransactionRollup.month == month,
+        models.TransactionRollup.category == category,
+        models.TransactionRollup.type == tx_type
+    ).scalar()
+    return float(total or 0.0)
+
+def _compute_from_transactions(db: Session, user_id: Optional[int] = None) -> Dict[RollupKey, Tuple[float, int]]:
+    month = month_bucket(db, models.Transaction.date)
+    query = db.query(
+        models.Transaction.user_id,
+        month,
+        models.Transaction.category,
+        models.Transaction.type,
+        func.sum(models.Transaction.amount),
+        func.count(models.Transaction.id)
+    )
+    if user_id is not None:
+        query = query.filter(models.Transaction.user_id == user_id)
+    rows = query.group_by(
+        models.Transaction.user_id,
+        month,
+        models.Transaction.category,
+        models.Transaction.type
+    ).all()
+    return {(row[0], row[1], row[2], row[3]): (float(row[4] or 0.0), int(row[5] or 0)) for row in rows}
+
+def _bump_data_versions(db: Session, user_ids) -> None:
+    # Stats responses are tagged with the user's data version, so a rebuild
+    # that rewrites their rollups must retire those tags (see crud.bump_data_version)
+    if not user_ids:
+        return
+    db.query(models.User).filter(models.User.id.in_(sorted(user_ids))).update(
+        {models.User.data_version: func.coalesce(models.User.data_version, 0) + 1},
+        synchronize_session=False
+    )
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Reconstruct rollups from the transactions table, for one user or everyone,
+    and bump the data version of every user whose rollups were rewritten
+    """
+    computed = _compute_from_transactions(db, user_id)
+    delete_query = db.query(models.TransactionRollup)
+    if user_id is not None:
+        delete_query = delete_query.filter(models.TransactionRollup.user_id == user_id)
+    affected_users = {row[0] for row in delete_query.with_entities(models.TransactionRollup.user_id).distinct()}
+    affected_users.update(key[0] for key in computed)
+    delete_query.delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.TransactionRollup, [
+        {
+            "user_id": key[0],
+            "month": key[1],
+            "category": key[2],
+            "type": key[3],
+            "total_amount": total,
+            "transaction_count": count
+        }
+        for key, (total, count) in computed.items()
+    ])
+    _bump_data_versions(db, affected_users)
+    db.commit()
+    return len(computed)
+
+def verify_rollups(db: Session, user_id: Optional[int] = None, tolerance: float = 0.005) -> List[str]:
+    """
+    Compare stored rollups to a fresh aggregation and describe every mismatch
+    """
+    expected = _compute_from_transactions(db, user_id)
+    query = db.query(models.TransactionRollup)
+    if user_id is not None:
+        query = query.filter(models.TransactionRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.month, row.category, row.type): (row.total_amount, row.transaction_count)
+        for row in query.all()
+    }
+
+    problems = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        want = expected.get(key)
+        have = stored.get(key)
+        if want is None:
+            problems.append(f"stale rollup {key}: {have}")
+        elif have is None:
+            problems.append(f"missing rollup {key}: expected {want}")
+        elif have[1] != want[1] or abs(have[0] - want[0]) > tolerance:
+            problems.append(f"mismatched rollup {key}: stored {have}, expected {want}")
+    return problems
+
+def ensure_rollups_populated(db: Session) -> int:
+    """
+    Backfill rollups once for databases created before the table existed
+    """
+    if db.query(models.TransactionRollup.id).first() is not None:
+        return 0
+    if db.query(models.Transaction.id).first() is None:
+        return 0
+    return rebuild_rollups(db)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the transaction rollup table")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            count = rebuild_rollups(db, args.user_id)
+            print(f"Rebuilt {count} rollup rows")
+            return 0
+        problems = verify_rollups(db, args.user_id)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} rollup mismatches")
+        return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
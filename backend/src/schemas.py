@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, conlist, root_validator, validator
 from datetime import datetime, date
 from typing import List, Optional, Any
 import json
@@ -43,6 +43,15 @@ class UserPreferencesUpdate(BaseModel):
     culture_tags: Optional[List[str]] = None
     calendar_opt_in: Optional[bool] = None
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    refresh_token: str
+    expires_in: int
+
 class TransactionBase(BaseModel):
     description: str
     amount: float
@@ -62,6 +71,65 @@ class TransactionResponse(TransactionBase):
     class Config:
         orm_mode = True
 
+class TransactionFilters(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    type: Optional[str] = None
+    category: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    search: Optional[str] = None
+
+# Ids are bound one parameter each; SQLite builds before 3.32 cap a statement at 999
+MAX_BATCH_IDS = 500
+
+BatchIds = conlist(int, min_items=1, max_items=MAX_BATCH_IDS)
+
+class TransactionBatchSelection(BaseModel):
+    ids: Optional[BatchIds] = None
+    filters: Optional[TransactionFilters] = None
+
+    @root_validator(skip_on_failure=True)
+    def require_selection(cls, values):
+        filters = values.get("filters")
+        if values.get("ids") is None and not (filters and any(value is not None for value in filters.dict().values())):
+            raise ValueError("Provide ids or at least one filter")
+        return values
+
+class TransactionBatchChanges(BaseModel):
+    description: Optional[str] = None
+    amount: Optional[float] = None
+    category: Optional[str] = None
+    type: Optional[str] = None
+    date: Optional[datetime] = None
+
+class TransactionBatchUpdate(TransactionBatchSelection):
+    changes: TransactionBatchChanges
+
+    @validator("changes")
+    def require_changes(cls, value):
+        if not value.dict(exclude_none=True):
+            raise ValueError("No changes given")
+        return value
+
+class BatchResult(BaseModel):
+    affected: int
+
+class TransactionImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+class TransactionImportResult(BaseModel):
+    format: str
+    rows_read: int
+    inserted: int
+    failed: int
+    batches: int
+    duration_seconds: float
+    rows_per_second: float
+    errors: List[TransactionImportError]
+    errors_truncated: bool = False
+
 class BudgetBase(BaseModel):
     category: str
     amount: float
@@ -70,6 +138,24 @@ class BudgetBase(BaseModel):
 class BudgetCreate(BudgetBase):
     pass
 
+class BudgetBatchChanges(BaseModel):
+    category: Optional[str] = None
+    amount: Optional[float] = None
+    period: Optional[str] = None
+
+class BudgetBatchUpdate(BaseModel):
+    ids: BatchIds
+    changes: BudgetBatchChanges
+
+    @validator("changes")
+    def require_changes(cls, value):
+        if not value.dict(exclude_none=True):
+            raise ValueError("No changes given")
+        return value
+
+class BudgetBatchDelete(BaseModel):
+    ids: BatchIds
+
 class BudgetResponse(BudgetBase):
     id: int
     user_id: int
@@ -79,6 +165,20 @@ class BudgetResponse(BudgetBase):
     class Config:
         orm_mode = True
 
+class BudgetProgress(BaseModel):
+    budget_id: int
+    category: str
+    period: str
+    amount: float
+    period_start: date
+    period_end: date
+    spent: float
+    remaining: float
+    pct_used: float
+    pct_elapsed: float
+    projected_spend: float
+    status: str  # on_track, at_risk or over
+
 class TransactionStats(BaseModel):
     total_income: float
     total_expenses: float
@@ -91,6 +191,20 @@ class TransactionStats(BaseModel):
     class Config:
         orm_mode = True
 
+def parse_tags(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parsed
+        except json.JSONDecodeError:
+            return [item.strip() for item in value.split(",") if item.strip()]
+    return []
+
 class HolidayEventResponse(BaseModel):
     id: int
     name: str
@@ -105,18 +219,7 @@ class HolidayEventResponse(BaseModel):
 
     @validator("tags", pre=True)
     def parse_tags(cls, value: Any) -> List[str]:
-        if value is None:
-            return []
-        if isinstance(value, list):
-            return value
-        if isinstance(value, str):
-            try:
-                parsed = json.loads(value)
-                if isinstance(parsed, list):
-                    return parsed
-            except json.JSONDecodeError:
-                return [item.strip() for item in value.split(",") if item.strip()]
-        return []
+        return parse_tags(value)
 
 class HolidayInsightCategory(BaseModel):
     category: str
@@ -132,3 +235,9 @@ class HolidayInsightResponse(BaseModel):
     explanation: str
     top_categories: List[HolidayInsightCategory]
     status: str
+
+class DashboardResponse(BaseModel):
+    stats: TransactionStats
+    recent_transactions: List[TransactionResponse]
+    holidays: List[HolidayEventResponse]
+    insights: List[HolidayInsightResponse]
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from . import crud, models, schemas
+from .database import ReadSessionLocal
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    # One JSON object per block of rows: {"column": [values...], ...}
+    "columnar": "application/x-ndjson",
+}
+EXPORT_DATASETS = ("transactions", "rollups")
+EXPORT_CHUNK_ROWS = 1000
+
+TRANSACTION_COLUMNS = (
+    ("id", models.Transaction.id),
+    ("date", models.Transaction.date),
+    ("description", models.Transaction.description),
+    ("amount", models.Transaction.amount),
+    ("category", models.Transaction.category),
+    ("type", models.Transaction.type),
+)
+ROLLUP_COLUMNS = (
+    ("month", models.TransactionRollup.month),
+    ("category", models.TransactionRollup.category),
+    ("type", models.TransactionRollup.type),
+    ("total_amount", models.TransactionRollup.total_amount),
+    ("transaction_count", models.TransactionRollup.transaction_count),
+)
+
+def _plain(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def _iter_blocks(db, user_id: int, dataset: str, filters: Optional[schemas.TransactionFilters]) -> Iterator[List[Sequence[Any]]]:
+    """
+    Yield lists of row tuples, fetched from the cursor EXPORT_CHUNK_ROWS at a time
+    """
+    if dataset == "rollups":
+        query = db.query(*[column for _, column in ROLLUP_COLUMNS]).filter(
+            models.TransactionRollup.user_id == user_id
+        ).order_by(models.TransactionRollup.month, models.TransactionRollup.category, models.TransactionRollup.type)
+    else:
+        query = crud.apply_transaction_filters(
+            db.query(*[column for _, column in TRANSACTION_COLUMNS]).filter(models.Transaction.user_id == user_id),
+            filters
+        ).order_by(models.Transaction.date, models.Transaction.id)
+    block = []
+    for row in query.yield_per(EXPORT_CHUNK_ROWS):
+        block.append(row)
+        if len(block) >= EXPORT_CHUNK_ROWS:
+            yield block
+            block = []
+    if block:
+        yield block
+
+def stream_export(
+    user_id: int,
+    file_format: str,
+    dataset: str = "transactions",
+    filters: Optional[schemas.TransactionFilters] = None
+) -> Iterator[bytes]:
+    """
+    Encode a user's transactions (or monthly rollups) block by block. The
+    generator owns its read session, so it can outlive the request handler
+    and the first bytes go out before the query is exhausted.
+    """
+    names = [name for name, _ in (ROLLUP_COLUMNS if dataset == "rollups" else TRANSACTION_COLUMNS)]
+    with ReadSessionLocal() as db:
+        if file_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for block in _iter_blocks(db, user_id, dataset, filters):
+                writer.writerows([[_plain(value) for value in row] for row in block])
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+        elif file_format == "ndjson":
+            for block in _iter_blocks(db, user_id, dataset, filters):
+                yield "".join(
+                    json.dumps(dict(zip(names, (_plain(value) for value in row)))) + "\n"
+                    for row in block
+                ).encode()
+        else:
+            for block in _iter_blocks(db, user_id, dataset, filters):
+                columns: Dict[str, List[Any]] = {
+                    name: [_plain(row[index]) for row in block]
+                    for index, name in enumerate(names)
+                }
+                yield (json.dumps(columns) + "\n").encode()
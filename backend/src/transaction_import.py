@@ -0,0 +1,151 @@
+import codecs
+import csv
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from . import crud, models, rollups, schemas
+from .core.config import settings
+
+IMPORT_FORMATS = ("csv", "ndjson")
+CSV_COLUMNS = ("description", "amount", "category", "type", "date")
+
+class ImportFormatError(ValueError):
+    """
+    The upload cannot be parsed at all (unknown format, missing CSV columns)
+    """
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Decode byte chunks incrementally and yield complete lines (with endings)
+    """
+    pending = ""
+    for text in codecs.iterdecode(chunks, "utf-8-sig"):
+        pending += text
+        end = pending.rfind("\n")
+        if end < 0:
+            continue
+        # Anything after the last newline continues in the next chunk
+        complete, pending = pending[:end + 1], pending[end + 1:]
+        for line in complete.split("\n")[:-1]:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+def _iter_csv(lines: Iterator[str]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(lines)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ImportFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, row
+
+def _iter_ndjson(lines: Iterator[str]) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as error:
+            yield line_number, error
+
+def _validate(row: Any) -> Tuple[Optional[schemas.TransactionCreate], List[str]]:
+    if isinstance(row, json.JSONDecodeError):
+        return None, [f"invalid JSON: {row.msg}"]
+    if not isinstance(row, dict):
+        return None, ["expected an object"]
+    value = row.get("date")
+    if isinstance(value, str) and len(value.strip()) == 10:
+        # Bank exports usually carry bare dates
+        row = {**row, "date": f"{value.strip()}T00:00:00"}
+    try:
+        return schemas.TransactionCreate(**{column: row.get(column) for column in CSV_COLUMNS}), []
+    except ValidationError as error:
+        return None, [f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()]
+
+def _insert_batch(db: Session, user_id: int, batch: List[schemas.TransactionCreate]) -> None:
+    """
+    Insert one batch with a single executemany, keep rollups and cached
+    insights consistent, and commit
+    """
+    db.execute(
+        models.Transaction.__table__.insert(),
+        [{**transaction.dict(), "user_id": user_id} for transaction in batch]
+    )
+    deltas: Dict[Tuple[str, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+    expense_days = set()
+    for transaction in batch:
+        delta = deltas[(rollups.month_key(transaction.date), transaction.category, transaction.type)]
+        delta[0] += transaction.amount
+        delta[1] += 1
+        if transaction.type == "expense":
+            expense_days.add(transaction.date.date())
+    rollups.apply_rollup_deltas(db, user_id, {key: (value[0], value[1]) for key, value in deltas.items()})
+    crud.invalidate_insights_for_days(db, user_id, sorted(expense_days))
+    crud.bump_data_version(db, user_id)
+    db.commit()
+
+def import_transactions(
+    db: Session,
+    user_id: int,
+    chunks: Iterable[bytes],
+    file_format: str,
+    batch_size: int = settings.IMPORT_BATCH_SIZE,
+    max_reported_errors: int = settings.IMPORT_MAX_REPORTED_ERRORS
+) -> Dict[str, Any]:
+    """
+    Stream-parse an upload and insert its valid rows in batches, one commit
+    per batch. Invalid rows are skipped and reported by line number; rows in
+    batches committed before a failure stay imported.
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise ImportFormatError(f"Unsupported import format: {file_format}")
+    started = time.perf_counter()
+    parse = _iter_csv if file_format == "csv" else _iter_ndjson
+    rows_read = inserted = failed = batches = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[schemas.TransactionCreate] = []
+
+    for line_number, row in parse(iter_lines(chunks)):
+        rows_read += 1
+        transaction, problems = _validate(row)
+        if problems:
+            failed += 1
+            if len(errors) < max_reported_errors:
+                errors.append({"line": line_number, "errors": problems})
+            continue
+        batch.append(transaction)
+        if len(batch) >= batch_size:
+            _insert_batch(db, user_id, batch)
+            inserted += len(batch)
+            batches += 1
+            batch = []
+    if batch:
+        _insert_batch(db, user_id, batch)
+        inserted += len(batch)
+        batches += 1
+
+    duration = time.perf_counter() - started
+    return {
+        "format": file_format,
+        "rows_read": rows_read,
+        "inserted": inserted,
+        "failed": failed,
+        "batches": batches,
+        "duration_seconds": round(duration, 4),
+        "rows_per_second": round(rows_read / duration, 1) if duration > 0 else 0.0,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
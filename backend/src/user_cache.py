@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from . import models
+from .core.config import settings
+
+class CachedUser(NamedTuple):
+    """
+    Read-only identity snapshot of a users row (no password hash)
+    """
+    id: int
+    email: str
+    name: str
+    country_code: Optional[str]
+    timezone: Optional[str]
+    culture_tags: Optional[str]
+    calendar_opt_in: Optional[bool]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, user: models.User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            country_code=user.country_code,
+            timezone=user.timezone,
+            culture_tags=user.culture_tags,
+            calendar_opt_in=user.calendar_opt_in,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+class UserIdentityCache:
+    """
+    Bounded LRU of token subject -> CachedUser with a per-entry TTL.
+    The TTL bounds staleness across worker processes; writes in this process
+    invalidate explicitly.
+    """
+
+    def __init__(self, maxsize: int = settings.AUTH_CACHE_SIZE, ttl_seconds: float = settings.AUTH_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, CachedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, subject: str) -> Optional[CachedUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, subject: str, user: CachedUser) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+user_cache = UserIdentityCache()
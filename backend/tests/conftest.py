@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import uuid
+
+# Settings and engines are read at import time, so point them at a scratch
+# database and switch off background jobs before anything imports src
+_DB_DIR = tempfile.mkdtemp(prefix="expense-tracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["HOLIDAY_SYNC_ENABLED"] = "false"
+os.environ["INSIGHT_SCHEDULER_ENABLED"] = "false"
+os.environ["METRICS_ENABLED"] = "true"
+os.environ["METRICS_TOKEN"] = "test-metrics-token"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import crud, schemas
+from src.bootstrap import bootstrap_database
+from src.core.security import create_access_token, get_password_hash
+from src.database import SessionLocal
+
+PASSWORD = "pw123456"
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    bootstrap_database()
+    yield
+
+@pytest.fixture(scope="session")
+def password_hash():
+    return get_password_hash(PASSWORD)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def make_user(db, password_hash):
+    def make(**fields):
+        user = crud.create_user(
+            db,
+            schemas.UserCreate(email=f"{uuid.uuid4().hex}@example.com", name="Test", password=PASSWORD),
+            password_hash
+        )
+        for key, value in fields.items():
+            setattr(user, key, value)
+        db.commit()
+        return user
+    return make
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+@pytest.fixture(scope="session")
+def client():
+    from src.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def auth_headers(user):
+    token = create_access_token(data={"sub": user.email, "uid": user.id})
+    return {"Authorization": f"Bearer {token}"}
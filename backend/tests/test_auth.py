@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from src import crud, models
+from src.core.config import settings
+from src.core.security import hash_refresh_token
+from src.database import SessionLocal
+
+from conftest import PASSWORD
+
+def _family_tokens(db, token):
+    db.expire_all()
+    family_id = db.query(models.RefreshToken.family_id).filter(
+        models.RefreshToken.token_hash == hash_refresh_token(token)
+    ).scalar()
+    return db.query(models.RefreshToken).filter(models.RefreshToken.family_id == family_id).all()
+
+def _age_rotation(db, token, seconds):
+    record = db.query(models.RefreshToken).filter(models.RefreshToken.token_hash == hash_refresh_token(token)).one()
+    record.revoked_at -= timedelta(seconds=seconds)
+    db.commit()
+
+def test_rotation_issues_a_new_token_and_reuse_revokes_the_family(db, user):
+    original = crud.create_refresh_token(db, user.id)
+
+    rotated_user, rotated = crud.rotate_refresh_token(db, original)
+    assert rotated_user.id == user.id and rotated != original
+
+    _age_rotation(db, original, settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS + 1)
+    assert crud.rotate_refresh_token(db, original) is None
+    assert crud.rotate_refresh_token(db, rotated) is None
+    assert all(token.revoked_at is not None for token in _family_tokens(db, original))
+
+def test_concurrent_refreshes_with_one_token_have_a_single_winner(db, user):
+    original = crud.create_refresh_token(db, user.id)
+
+    def rotate(_):
+        with SessionLocal() as session:
+            result = crud.rotate_refresh_token(session, original)
+            return result[1] if result else None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [token for token in pool.map(rotate, range(8)) if token]
+
+    assert len(results) == 1
+    live = [token for token in _family_tokens(db, original) if token.revoked_at is None]
+    assert len(live) == 1
+
+def test_replay_within_the_grace_window_keeps_the_family(db, user):
+    original = crud.create_refresh_token(db, user.id)
+    _, rotated = crud.rotate_refresh_token(db, original)
+
+    assert crud.rotate_refresh_token(db, original) is None
+    assert crud.rotate_refresh_token(db, rotated) is not None
+
+def test_refresh_endpoint_rotates_and_rejects_replay(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    login = client.post("/api/auth/login", data={"username": user.email, "password": PASSWORD})
+    assert login.status_code == 200
+    first = login.json()["refresh_token"]
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": first})
+    assert refreshed.status_code == 200
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {refreshed.json()['access_token']}"}).status_code == 200
+
+    assert client.post("/api/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": refreshed.json()["refresh_token"]}).status_code == 401
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src import crud, models, rollups, schemas
+from src.holiday_calendar import holiday_calendar
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/transactions/batch/update", {"ids": [], "changes": {"category": "Other"}}),
+    ("/api/transactions/batch/delete", {"ids": []}),
+    ("/api/budgets/batch/update", {"ids": [], "changes": {"amount": 10}}),
+    ("/api/budgets/batch/delete", {"ids": []}),
+    ("/api/transactions/batch/delete", {"ids": list(range(1, schemas.MAX_BATCH_IDS + 2))}),
+    ("/api/budgets/batch/delete", {"ids": list(range(1, schemas.MAX_BATCH_IDS + 2))}),
+])
+def test_batch_id_lists_must_be_non_empty_and_bounded(client, auth_headers, path, body):
+    assert client.post(path, json=body, headers=auth_headers).status_code == 422
+
+def _transaction(db, user_id, day, category, amount, tx_type="expense"):
+    return crud.create_transaction(db, schemas.TransactionCreate(
+        description=f"{category} {day}",
+        amount=amount,
+        category=category,
+        type=tx_type,
+        date=datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+    ), user_id)
+
+def _save_insight(db, user_id, event_id, day):
+    window_start, window_end = crud.holiday_window(day)
+    crud._save_insight(db, user_id, event_id, {
+        "window_start": window_start,
+        "window_end": window_end,
+        "dependency_ranges": [(window_start, window_end), crud._baseline_window(window_start, window_end)]
+    })
+
+def _cached_insight(db, user_id, day):
+    event = models.HolidayEvent(name=f"Batch Test Day {day}", date=day, country_code="ZB", type="public", tags="[]")
+    db.add(event)
+    db.commit()
+    holiday_calendar.invalidate()
+    _save_insight(db, user_id, event.id, day)
+    return event.id
+
+def _is_expired(db, user_id, event_id):
+    db.expire_all()
+    insight = db.query(models.HolidayInsight).filter(
+        models.HolidayInsight.user_id == user_id,
+        models.HolidayInsight.holiday_event_id == event_id
+    ).one()
+    return insight.expires_at <= datetime.utcnow()
+
+def test_batch_rollup_deltas_and_insight_invalidation(db, make_user):
+    user = make_user(country_code="ZB")
+    today = date.today()
+    near, far = today + timedelta(days=10), today + timedelta(days=90)
+    near_insight = _cached_insight(db, user.id, near)
+    far_insight = _cached_insight(db, user.id, far)
+
+    # Two months, two categories, one income row, all outside the far insight's windows
+    spent = [
+        _transaction(db, user.id, near - timedelta(days=3), "Food", 12.5),
+        _transaction(db, user.id, near - timedelta(days=2), "Food", 7.25),
+        _transaction(db, user.id, near - timedelta(days=40), "Travel", 100.0),
+        _transaction(db, user.id, near - timedelta(days=41), "Food", 3.0),
+    ]
+    income = _transaction(db, user.id, near - timedelta(days=2), "Salary", 900.0, tx_type="income")
+    assert rollups.verify_rollups(db, user.id) == []
+    # The single-row writes above already expired it; re-arm it for the batch
+    _save_insight(db, user.id, near_insight, near)
+    assert not _is_expired(db, user.id, near_insight)
+
+    recategorised = crud.batch_update_transactions(db, user.id, schemas.TransactionBatchUpdate(
+        ids=[spent[0].id, spent[2].id, income.id],
+        changes={"category": "Gifts"}
+    ))
+    assert recategorised == 3
+    assert rollups.verify_rollups(db, user.id) == []
+    assert _is_expired(db, user.id, near_insight)
+    assert not _is_expired(db, user.id, far_insight)
+
+    _save_insight(db, user.id, near_insight, near)
+    deleted = crud.batch_delete_transactions(db, user.id, schemas.TransactionBatchSelection(
+        filters={"category": "Gifts"}
+    ))
+    assert deleted == 3
+    assert rollups.verify_rollups(db, user.id) == []
+    assert _is_expired(db, user.id, near_insight)
+    assert not _is_expired(db, user.id, far_insight)
+
+    remaining = db.query(models.TransactionRollup).filter(models.TransactionRollup.user_id == user.id).all()
+    assert sorted((row.category, row.transaction_count) for row in remaining) == [("Food", 1), ("Food", 1)]
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from src import crud, models, rollups, schemas
+from src.database import read_engine
+from src.holiday_calendar import holiday_calendar
+
+def _revalidate(client, path, headers, etag):
+    return client.get(path, headers={**headers, "If-None-Match": etag})
+
+def test_transactions_304_until_a_write(client, auth_headers):
+    first = client.get("/api/transactions", headers=auth_headers)
+    etag = first.headers["ETag"]
+    not_modified = _revalidate(client, "/api/transactions", auth_headers, etag)
+    assert not_modified.status_code == 304 and not_modified.headers["ETag"] == etag
+
+    created = client.post("/api/transactions", headers=auth_headers, json={
+        "description": "Coffee", "amount": 3.5, "category": "Food", "type": "expense", "date": "2025-04-02T08:00:00"
+    })
+    assert created.status_code == 200
+    changed = _revalidate(client, "/api/transactions", auth_headers, etag)
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [row["description"] for row in changed.json()] == ["Coffee"]
+
+def test_rollup_rebuild_retires_stats_etags(client, db, user, auth_headers):
+    crud.create_transaction(db, schemas.TransactionCreate(
+        description="Rent", amount=800, category="Housing", type="expense", date=datetime(2025, 4, 1)
+    ), user.id)
+    etag = client.get("/api/stats/transactions", headers=auth_headers).headers["ETag"]
+    assert _revalidate(client, "/api/stats/transactions", auth_headers, etag).status_code == 304
+
+    rollups.rebuild_rollups(db, user.id)
+    assert _revalidate(client, "/api/stats/transactions", auth_headers, etag).status_code == 200
+
+    etag = client.get("/api/stats/transactions", headers=auth_headers).headers["ETag"]
+    rollups.rebuild_rollups(db)
+    assert _revalidate(client, "/api/stats/transactions", auth_headers, etag).status_code == 200
+
+def test_holidays_revalidate_without_loading_events(client, db, auth_headers, monkeypatch):
+    db.add(models.HolidayEvent(name="Tag Day", date=date(2025, 6, 3), country_code="ZE", type="public", tags="[]"))
+    db.commit()
+    holiday_calendar.invalidate()
+    path = "/api/holidays?country=ZE&from=2025-06-01&to=2025-06-30"
+    first = client.get(path, headers=auth_headers)
+    assert [row["name"] for row in first.json()] == ["Tag Day"]
+    etag = first.headers["ETag"]
+
+    def no_sync(*args):
+        raise AssertionError("a revalidation must not look for missing holidays")
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    monkeypatch.setattr(crud, "ensure_holidays_for_range", no_sync)
+    event.listen(read_engine, "before_cursor_execute", record)
+    try:
+        assert _revalidate(client, path, auth_headers, etag).status_code == 304
+    finally:
+        event.remove(read_engine, "before_cursor_execute", record)
+    assert not any("holiday" in statement for statement in statements)
+    monkeypatch.undo()
+
+    db.add(models.HolidayEvent(name="Tag Night", date=date(2025, 6, 20), country_code="ZE", type="public", tags="[]"))
+    db.commit()
+    holiday_calendar.invalidate()
+    changed = _revalidate(client, path, auth_headers, etag)
+    assert changed.status_code == 200
+    assert [row["name"] for row in changed.json()] == ["Tag Day", "Tag Night"]
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+import pytest
+
+from src import crud, models, schemas
+from src.core.config import settings
+from src.core.security import create_access_token
+from src.holiday_calendar import holiday_calendar
+
+@pytest.fixture
+def populated_headers(db, make_user):
+    user = make_user(country_code="ZF")
+    for index in range(5):
+        crud.create_transaction(db, schemas.TransactionCreate(
+            description=f"Row {index}",
+            amount=10.5 + index,
+            category=["Food", "Travel"][index % 2],
+            type=["expense", "income"][index % 3 == 0],
+            date=datetime(2025, 3, 1 + index, 9, 30)
+        ), user.id)
+    crud.create_budget(db, schemas.BudgetCreate(category="Food", amount=250, period="monthly"), user.id)
+    crud.create_budget(db, schemas.BudgetCreate(category="Travel", amount=80.25, period="weekly"), user.id)
+    if not db.query(models.HolidayEvent).filter(models.HolidayEvent.country_code == "ZF").count():
+        db.add_all([
+            models.HolidayEvent(name="Fast Day", date=date(2025, 3, 4), country_code="ZF", type="public", tags='["family"]'),
+            models.HolidayEvent(name="Slow Day", date=date(2025, 3, 20), country_code="ZF", type="observance", tags=None),
+        ])
+        db.commit()
+        holiday_calendar.invalidate()
+    token = create_access_token(data={"sub": user.email, "uid": user.id})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.mark.parametrize("path", [
+    "/api/transactions?limit=3",
+    "/api/budgets",
+    "/api/holidays?from=2025-03-01&to=2025-03-31",
+])
+def test_fast_path_matches_the_pydantic_body(client, populated_headers, monkeypatch, path):
+    bodies = {}
+    for fast in (False, True):
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast)
+        response = client.get(path, headers=populated_headers)
+        assert response.status_code == 200
+        bodies[fast] = (response.json(), response.headers.get("ETag"), response.headers.get("X-Next-Cursor"))
+
+    assert bodies[True] == bodies[False]
+    assert bodies[True][0]
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database import SessionLocal
+from src.holiday_calendar import HolidayCalendarIndex
+
+def _counting_index(delay=0.0):
+    index = HolidayCalendarIndex(refresh_seconds=3600)
+    rebuild = index._rebuild
+    calls = []
+    lock = threading.Lock()
+
+    def counted(db):
+        with lock:
+            calls.append(threading.get_ident())
+        time.sleep(delay)
+        return rebuild(db)
+
+    index._rebuild = counted
+    return index, calls
+
+def _lookup(index):
+    with SessionLocal() as db:
+        return index.for_country(db, "US")
+
+def test_stale_index_is_rebuilt_by_one_thread_while_others_serve_the_old_snapshot(db):
+    index, calls = _counting_index(delay=0.2)
+    index.warm(db)
+    old = index._calendars
+    index._built_at -= 7200
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: _lookup(index), range(8)))
+
+    assert len(calls) == 2
+    assert index._calendars is not old
+    assert all(result.events for result in results)
+
+def test_cold_index_is_built_once_under_concurrency():
+    index, calls = _counting_index(delay=0.1)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: _lookup(index), range(8)))
+
+    assert len(calls) == 1
+    assert all(result.events for result in results)
+
+def test_warm_skips_a_current_snapshot(db):
+    index, calls = _counting_index()
+    index.warm(db)
+    index.warm(db)
+    assert len(calls) == 1
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import models
+from src.core.config import settings
+from src.database import SessionLocal
+from src.holiday_provider import CalendarificClient
+from src.holiday_sync import HolidaySync, backoff_delay, record_fetch
+
+class StubCalendarific(BaseHTTPRequestHandler):
+    """
+    Minimal Calendarific stand-in: country "XE" fails with a 500, every other
+    country gets two holidays. Requests are recorded with their client port.
+    """
+    protocol_version = "HTTP/1.1"
+    requests = []
+    delay = 0.0
+
+    def do_GET(self):
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+        type(self).requests.append((self.client_address[1], query["country"], int(query["year"])))
+        time.sleep(type(self).delay)
+        if query["country"] == "XE":
+            body = b'{"error": "boom"}'
+            self.send_response(500)
+        else:
+            body = json.dumps({"response": {"holidays": [
+                {"name": "Stub Day", "date": {"iso": f"{query['year']}-05-01"}, "type": ["National holiday"]},
+                {"name": "Stub Night", "date": {"iso": f"{query['year']}-11-02T18:00:00"}, "type": ["Observance"]},
+            ]}}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def provider(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCalendarific)
+    StubCalendarific.requests = []
+    StubCalendarific.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "CALENDARIFIC_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "HOLIDAY_API_PROVIDER", "calendarific")
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api/v2"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def _fetch_log(db, country_code, year):
+    db.expire_all()
+    return db.query(models.HolidayFetchLog).filter(
+        models.HolidayFetchLog.country_code == country_code,
+        models.HolidayFetchLog.year == year
+    ).one()
+
+def test_client_reuses_one_keep_alive_connection(provider):
+    client = CalendarificClient(base_url=provider)
+    try:
+        first = client.fetch("XA", 2025)
+        second = client.fetch("XA", 2026)
+    finally:
+        client.close()
+
+    assert first[0] == second[0] == "ok"
+    assert [holiday["name"] for holiday in first[1]] == ["Stub Day", "Stub Night"]
+    ports = {port for port, _, _ in StubCalendarific.requests}
+    assert len(StubCalendarific.requests) == 2 and len(ports) == 1
+
+def test_failed_fetch_is_logged_and_backed_off(db, provider):
+    syncer = HolidaySync(max_workers=2, base_url=provider)
+
+    stats = syncer.sync(db, [("XE", 2025), ("XB", 2025)])
+    assert stats["targets"] == 2 and stats["failed"] == 1 and stats["inserted"] == 2
+
+    log = _fetch_log(db, "XE", 2025)
+    assert log.status == "error" and log.attempts == 1
+    expected_retry = log.last_attempt_at + backoff_delay(1)
+    assert abs((log.next_retry_at - expected_retry).total_seconds()) < 1
+    assert _fetch_log(db, "XB", 2025).status == "ok"
+
+    StubCalendarific.requests = []
+    assert syncer.sync(db, [("XE", 2025), ("XB", 2025)])["targets"] == 0
+    assert StubCalendarific.requests == []
+
+    log.next_retry_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert syncer.sync(db, [("XE", 2025)])["failed"] == 1
+    assert _fetch_log(db, "XE", 2025).attempts == 2
+
+def test_concurrent_syncs_of_one_target_fetch_and_insert_once(db, provider):
+    StubCalendarific.delay = 0.2
+    syncer = HolidaySync(max_workers=2, base_url=provider)
+
+    def run(_):
+        with SessionLocal() as session:
+            return syncer.sync(session, [("XC", 2025)])
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(StubCalendarific.requests) == 1
+    names = [row.name for row in db.query(models.HolidayEvent).filter(models.HolidayEvent.country_code == "XC").all()]
+    assert sorted(names) == ["Stub Day", "Stub Night"]
+
+def test_separate_processes_cannot_insert_duplicate_holidays(db, provider):
+    StubCalendarific.delay = 0.2
+    syncers = [HolidaySync(max_workers=1, base_url=provider) for _ in range(3)]
+
+    def run(syncer):
+        with SessionLocal() as session:
+            return syncer.sync(session, [("XD", 2025)])
+
+    with ThreadPoolExecutor(max_workers=len(syncers)) as pool:
+        futures = [pool.submit(run, syncer) for syncer in syncers]
+        results = [future.result() for future in futures]
+
+    assert all(stats["targets"] == 1 and stats["failed"] == 0 for stats in results)
+    assert sum(stats["inserted"] for stats in results) == 2
+    assert len(StubCalendarific.requests) == 3
+    names = [row.name for row in db.query(models.HolidayEvent).filter(models.HolidayEvent.country_code == "XD").all()]
+    assert sorted(names) == ["Stub Day", "Stub Night"]
+    logs = db.query(models.HolidayFetchLog).filter(
+        models.HolidayFetchLog.country_code == "XD",
+        models.HolidayFetchLog.year == 2025
+    ).all()
+    assert len(logs) == 1 and logs[0].status == "ok"
+
+def test_concurrent_fetch_logs_of_one_target_share_a_row(db):
+    barrier = threading.Barrier(8)
+
+    def record(index):
+        with SessionLocal() as session:
+            barrier.wait()
+            record_fetch(session, "XG", 2025, "error", 0)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(record, range(8)))
+
+    log = _fetch_log(db, "XG", 2025)
+    assert log.attempts == 8 and log.status == "error"
+    expected_retry = log.last_attempt_at + backoff_delay(8)
+    assert abs((log.next_retry_at - expected_retry).total_seconds()) < 1
+
+def test_requested_fetches_respect_the_sync_switch(db, provider, monkeypatch):
+    syncer = HolidaySync(max_workers=1, base_url=provider)
+    monkeypatch.setattr(settings, "HOLIDAY_SYNC_ENABLED", False)
+    assert syncer.request(db, "XF", date(2025, 1, 1), date(2025, 12, 31)) == 0
+
+    monkeypatch.setattr(settings, "HOLIDAY_SYNC_ENABLED", True)
+    assert syncer.request(db, "XF", date(2025, 1, 1), date(2025, 12, 31)) == 1
+    syncer._background.shutdown(wait=True)
+    assert [(country, year) for _, country, year in StubCalendarific.requests] == [("XF", 2025)]
@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta
+
+from src import models
+from src.holiday_calendar import holiday_calendar
+from src.insight_scheduler import InsightScheduler, acquire_lease, find_stale_users, release_lease
+
+def test_run_once_writes_insights_for_stale_user(db, make_user):
+    event = models.HolidayEvent(
+        name="Scheduler Test Day",
+        date=date.today() + timedelta(days=10),
+        country_code="ZZ",
+        type="public",
+        tags="[]"
+    )
+    db.add(event)
+    db.commit()
+    holiday_calendar.invalidate()
+    user = make_user(country_code="ZZ")
+    scheduler = InsightScheduler(max_workers=1, window_days=30, executor="thread")
+
+    assert user.id in find_stale_users(db, scheduler.window_days)
+    stats = scheduler.run_once()
+
+    assert stats["failures"] == 0
+    insight = db.query(models.HolidayInsight).filter(models.HolidayInsight.user_id == user.id).one()
+    assert insight.holiday_event_id == event.id
+    assert insight.expires_at > datetime.utcnow()
+    assert user.id not in find_stale_users(db, scheduler.window_days)
+
+def test_lease_elects_one_scheduler_until_it_goes_stale(db):
+    now = datetime.utcnow()
+    try:
+        assert acquire_lease(db, "worker-a", ttl_seconds=60, now=now)
+        assert not acquire_lease(db, "worker-b", ttl_seconds=60, now=now + timedelta(seconds=30))
+        assert acquire_lease(db, "worker-a", ttl_seconds=60, now=now + timedelta(seconds=30))
+        assert acquire_lease(db, "worker-b", ttl_seconds=60, now=now + timedelta(seconds=120))
+        assert not acquire_lease(db, "worker-a", ttl_seconds=60, now=now + timedelta(seconds=130))
+    finally:
+        release_lease(db, "worker-a")
+        release_lease(db, "worker-b")
+
+def test_stale_users_only_come_from_countries_with_upcoming_events(db, make_user):
+    db.add(models.HolidayEvent(
+        name="Scheduler Tagged Day",
+        date=date.today() + timedelta(days=5),
+        country_code="ZW",
+        type="public",
+        tags='["harvest"]'
+    ))
+    db.commit()
+    holiday_calendar.invalidate()
+    matching = make_user(country_code="ZW", culture_tags='["harvest"]')
+    other_tags = make_user(country_code="ZW", culture_tags='["winter"]')
+    opted_out = make_user(country_code="ZW", calendar_opt_in=False)
+    elsewhere = make_user(country_code="ZV")
+
+    stale = find_stale_users(db, window_days=30)
+    assert matching.id in stale
+    assert not {other_tags.id, opted_out.id, elsewhere.id} & set(stale)
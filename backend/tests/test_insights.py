@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from src import crud, models, schemas
+from src.database import SessionLocal
+from src.holiday_calendar import holiday_calendar
+
+def _add_event(db, days_ahead=10, country_code="ZZ"):
+    event = models.HolidayEvent(
+        name=f"Insight Test Day +{days_ahead}",
+        date=date.today() + timedelta(days=days_ahead),
+        country_code=country_code,
+        type="public",
+        tags="[]"
+    )
+    db.add(event)
+    db.commit()
+    holiday_calendar.invalidate()
+    return event
+
+def test_concurrent_saves_of_one_key_upsert(db, user):
+    event = _add_event(db)
+    window_start, window_end = crud.holiday_window(event.date)
+
+    def save(index):
+        with SessionLocal() as session:
+            crud._save_insight(session, user.id, event.id, {
+                "window_start": window_start,
+                "window_end": window_end,
+                "pct_change": float(index),
+                "explanation": f"pass {index}"
+            })
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(24)))
+
+    rows = db.query(models.HolidayInsight).filter(models.HolidayInsight.user_id == user.id).all()
+    assert len(rows) == 1
+    assert rows[0].explanation == f"pass {int(rows[0].pct_change)}"
+
+def _cached_insight(db, user_id):
+    db.expire_all()
+    return db.query(models.HolidayInsight).filter(models.HolidayInsight.user_id == user_id).one()
+
+def test_budget_writes_expire_cached_insights(db, make_user):
+    event = _add_event(db, days_ahead=12, country_code="ZY")
+    user = make_user(country_code="ZY")
+    crud.get_holiday_insights(db, user, window_days=30)
+    assert _cached_insight(db, user.id).expires_at > datetime.utcnow()
+
+    budget = crud.create_budget(db, schemas.BudgetCreate(category="Food", amount=100, period="monthly"), user.id)
+    assert _cached_insight(db, user.id).expires_at <= datetime.utcnow()
+
+    crud.get_holiday_insights(db, user, window_days=30)
+    assert _cached_insight(db, user.id).expires_at > datetime.utcnow()
+    crud.update_budget(db, budget.id, schemas.BudgetCreate(category="Food", amount=50, period="monthly"))
+    assert _cached_insight(db, user.id).expires_at <= datetime.utcnow()
+    assert _cached_insight(db, user.id).holiday_event_id == event.id
+
+def test_insight_expiry_stops_at_the_current_budget_period(db, user):
+    event = _add_event(db, days_ahead=14)
+    window_start, window_end = crud.holiday_window(event.date)
+    crud._save_insight(db, user.id, event.id, {"window_start": window_start, "window_end": window_end})
+
+    today = datetime.utcnow().date()
+    period_end = min(crud._get_week_range(today)[1], crud._get_month_range(today)[1]) + timedelta(days=1)
+    assert _cached_insight(db, user.id).expires_at <= datetime.combine(period_end, datetime.min.time())
@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.metrics import MetricsRegistry
+
+def _metrics_headers():
+    return {"Authorization": f"Bearer {settings.METRICS_TOKEN}"}
+
+def test_auth_internals_are_only_exposed_through_metrics(client, auth_headers):
+    assert client.get("/api/auth/stats", headers=auth_headers).status_code == 404
+    client.get("/api/auth/me", headers=auth_headers)
+
+    body = client.get("/metrics", headers=_metrics_headers()).text
+    assert "auth_identity_cache_hits_total" in body
+    assert "password_hash_rejected_total" in body
+
+def test_metrics_require_the_token_and_can_be_switched_off(client, auth_headers, monkeypatch):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth_headers).status_code == 401
+
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    assert client.get("/metrics", headers=_metrics_headers()).status_code == 404
+
+def _checkouts(registry, name):
+    return sum(sum(series[:-1]) for labels, series in registry.pool_wait._series.items() if labels == (name,))
+
+def test_pool_checkouts_are_still_timed_after_dispose(tmp_path):
+    registry = MetricsRegistry()
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db")
+    registry.instrument_engine(engine, "scratch")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert _checkouts(registry, "scratch") == 1
+
+        engine.dispose()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert _checkouts(registry, "scratch") == 2
+    finally:
+        engine.dispose()
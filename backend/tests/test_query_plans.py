@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src import models
+from src.db_migrations import explain_hot_queries, run_migrations
+
+HOT_INDEXES = ["ix_transactions_user_date", "ix_transactions_user_type_date_category", "ix_budgets_user_id"]
+
+def _migrated_memory_engine():
+    bind = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=bind)
+    # Start from a pre-index schema so the migrations, not create_all, provide the indexes
+    with bind.begin() as conn:
+        for name in HOT_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+    run_migrations(bind)
+    return bind
+
+def _rollup_key_index(bind):
+    # SQLite names the index behind a UNIQUE constraint itself (sqlite_autoindex_...)
+    with bind.connect() as conn:
+        for index in conn.execute(text("PRAGMA index_list(transaction_rollups)")):
+            columns = [row[2] for row in conn.execute(text(f"PRAGMA index_info('{index[1]}')"))]
+            if index[2] and columns[:1] == ["user_id"]:
+                return index[1]
+
+def test_hot_queries_use_their_indexes():
+    bind = _migrated_memory_engine()
+    try:
+        plans = explain_hot_queries(bind)
+        rollup_index = _rollup_key_index(bind)
+    finally:
+        bind.dispose()
+
+    assert any("ix_transactions_user_date" in line for line in plans["transaction page"])
+    assert any("ix_transactions_user_type_date_category" in line for line in plans["insight expense series"])
+    assert any("ix_budgets_user_id" in line for line in plans["budget list"])
+    assert rollup_index is not None
+    assert any(f"SEARCH transaction_rollups USING INDEX {rollup_index}" in line for line in plans["transaction stats"])
+    assert not any(line.startswith("SCAN") for line in plans["transaction stats"])
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import func
+
+from src import crud, models, rollups, schemas
+from src.database import SessionLocal
+
+def _transaction(amount=1.0, category="Food", tx_type="expense", day=datetime(2025, 3, 14, 12)):
+    return schemas.TransactionCreate(
+        description="test",
+        amount=amount,
+        category=category,
+        type=tx_type,
+        date=day
+    )
+
+def test_concurrent_creates_keep_rollup_totals_exact(db, user):
+    def create(index):
+        with SessionLocal() as session:
+            crud.create_transaction(session, _transaction(amount=1.0 + index), user.id)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(create, range(40)))
+
+    assert rollups.verify_rollups(db, user.id) == []
+    rollup = db.query(models.TransactionRollup).filter(models.TransactionRollup.user_id == user.id).one()
+    total = db.query(func.sum(models.Transaction.amount)).filter(models.Transaction.user_id == user.id).scalar()
+    assert rollup.transaction_count == 40
+    assert rollup.total_amount == total
+
+def test_update_and_delete_move_and_drop_buckets(db, user):
+    first = crud.create_transaction(db, _transaction(amount=10.0), user.id)
+    second = crud.create_transaction(db, _transaction(amount=5.0, day=datetime(2025, 4, 2)), user.id)
+
+    crud.update_transaction(db, first.id, _transaction(amount=12.0, category="Travel"))
+    crud.delete_transaction(db, second.id)
+
+    assert rollups.verify_rollups(db, user.id) == []
+    buckets = {(row.month, row.category): row.total_amount for row in rollups.get_user_rollups(db, user.id)}
+    assert buckets == {("2025-03", "Travel"): 12.0}
@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { transactionService } from '../services/transactionService';
 import { budgetService } from '../services/budgetService';
 import {
   Target,
@@ -26,7 +25,7 @@ const Budget = () => {
   const { user, loading } = useAuth();
   const navigate = useNavigate();
   const [budgets, setBudgets] = useState([]);
-  const [transactions, setTransactions] = useState([]);
+  const [progressByBudget, setProgressByBudget] = useState({});
   const [loadingData, setLoadingData] = useState(true);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editingBudget, setEditingBudget] = useState(null);
@@ -51,13 +50,15 @@ const Budget = () => {
   const fetchData = async () => {
     try {
       setLoadingData(true);
-      const [transactionsResponse, budgetsResponse] = await Promise.all([
-        transactionService.getAllTransactions(),
-        budgetService.getAllBudgets()
+      const [budgetsResponse, progressResponse] = await Promise.all([
+        budgetService.getAllBudgets(),
+        budgetService.getBudgetProgress()
       ]);
-      
-      setTransactions(transactionsResponse.data);
+
       setBudgets(budgetsResponse.data);
+      setProgressByBudget(
+        Object.fromEntries(progressResponse.data.map(progress => [progress.budget_id, progress]))
+      );
     } catch (error) {
       console.error('Error fetching budget data:', error);
     } finally {
@@ -65,22 +66,10 @@ const Budget = () => {
     }
   };
 
-  const getCategorySpending = (category) => {
-    const categoryTransactions = transactions.filter(
-      transaction => transaction.category === category && transaction.type === 'expense'
-    );
-    
-    return categoryTransactions.reduce((sum, transaction) => sum + transaction.amount, 0);
-  };
+  // Spend for the budget's current period, computed server-side
+  const getBudgetSpending = (budget) => progressByBudget[budget.id]?.spent ?? 0;
 
-  const getBudgetProgress = (budget) => {
-    const spending = getCategorySpending(budget.category);
-    const amount = parseFloat(budget.amount);
-    if (!Number.isFinite(amount) || amount <= 0) {
-      return 0;
-    }
-    return Math.min((spending / amount) * 100, 100);
-  };
+  const getBudgetProgress = (budget) => progressByBudget[budget.id]?.pct_used ?? 0;
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -143,7 +132,7 @@ const Budget = () => {
 
   // Prepare data for chart
   const chartData = budgets.map(budget => {
-    const spending = getCategorySpending(budget.category);
+    const spending = getBudgetSpending(budget);
     const remaining = budget.amount - spending;
     
     return {
@@ -221,7 +210,7 @@ const Budget = () => {
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
         {!loadingData && budgets.length > 0 ? (
           budgets.map((budget) => {
-            const spending = getCategorySpending(budget.category);
+            const spending = getBudgetSpending(budget);
             const remaining = budget.amount - spending;
             const progress = getBudgetProgress(budget);
             const isOverBudget = progress > 100;
@@ -1,7 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { transactionService } from '../services/transactionService';
+import { dashboardService } from '../services/dashboardService';
 import { holidayService } from '../services/holidayService';
 import {
   PieChart as PieChartIcon,
@@ -47,15 +47,17 @@ const Dashboard = () => {
     }
   }, [loading, user, navigate]);
 
+  // The first month of holidays arrives with the dashboard payload
+  const initialHolidayMonth = useRef(holidayMonth);
+
   useEffect(() => {
     if (user) {
       fetchData();
-      fetchHolidayInsights();
     }
   }, [user]);
 
   useEffect(() => {
-    if (user) {
+    if (user && holidayMonth !== initialHolidayMonth.current) {
       fetchHolidaysForMonth(holidayMonth);
     }
   }, [user, holidayMonth]);
@@ -63,13 +65,22 @@ const Dashboard = () => {
   const fetchData = async () => {
     try {
       setLoadingData(true);
-      const [transactionsResponse, statsResponse] = await Promise.all([
-        transactionService.getAllTransactions(),
-        transactionService.getTransactionStats()
-      ]);
-      
-      setTransactions(transactionsResponse.data);
-      const statsData = statsResponse.data || {};
+      setHolidayLoading(true);
+      setHolidayError('');
+      const { start, end } = getMonthRange(initialHolidayMonth.current);
+      const response = await dashboardService.getDashboard({
+        country: user?.country_code,
+        from: formatDate(start),
+        to: formatDate(end),
+        windowDays: 30
+      });
+      const data = response.data || {};
+
+      setTransactions(data.recent_transactions || []);
+      setHolidays(data.holidays || []);
+      setHolidayInsights(data.insights || []);
+
+      const statsData = data.stats || {};
       const monthlySummary = statsData.monthly_summary || {};
       const monthlyData = Object.entries(monthlySummary).map(([month, values]) => ({
         month,
@@ -86,25 +97,20 @@ const Dashboard = () => {
         categoryBreakdown: statsData.category_breakdown ?? {},
         monthlyData
       });
-      
-      // Process category data for pie chart
-      const categoryMap = {};
-      transactionsResponse.data.forEach(transaction => {
-        if (transaction.type === 'expense') {
-          categoryMap[transaction.category] = (categoryMap[transaction.category] || 0) + transaction.amount;
-        }
-      });
-      
-      const categoryData = Object.entries(categoryMap).map(([category, amount]) => ({
+
+      // Expense totals per category for the pie chart, over the full history
+      const categoryData = Object.entries(statsData.category_breakdown || {}).map(([category, amount]) => ({
         name: category,
         value: amount
       }));
-      
+
       setCategories(categoryData);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
+      setHolidayError('Unable to load holiday insights.');
     } finally {
       setLoadingData(false);
+      setHolidayLoading(false);
     }
   };
 
@@ -137,20 +143,6 @@ const Dashboard = () => {
     }
   };
 
-  const fetchHolidayInsights = async () => {
-    try {
-      setHolidayLoading(true);
-      setHolidayError('');
-      const response = await holidayService.getHolidayInsights({ windowDays: 30 });
-      setHolidayInsights(response.data || []);
-    } catch (error) {
-      console.error('Error fetching holiday insights:', error);
-      setHolidayError('Unable to load holiday insights.');
-    } finally {
-      setHolidayLoading(false);
-    }
-  };
-
   if (loading || !user) {
     return (
       <div className="flex items-center justify-center min-h-[60vh]">
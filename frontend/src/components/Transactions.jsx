@@ -4,6 +4,8 @@ import { useNavigate } from 'react-router-dom';
 import { transactionService } from '../services/transactionService';
 import {
   Plus,
+  Upload,
+  Download,
   Search,
   Filter,
   Trash2,
@@ -13,18 +15,24 @@ import {
   X
 } from 'lucide-react';
 
+const PAGE_SIZE = 50;
+
 const Transactions = () => {
   const { user, loading } = useAuth();
   const navigate = useNavigate();
   const [transactions, setTransactions] = useState([]);
-  const [filteredTransactions, setFilteredTransactions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loadingData, setLoadingData] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [filterType, setFilterType] = useState('all');
   const [filterCategory, setFilterCategory] = useState('all');
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editingTransaction, setEditingTransaction] = useState(null);
   const [submitError, setSubmitError] = useState('');
+  const [importing, setImporting] = useState(false);
+  const [importMessage, setImportMessage] = useState('');
   const [formData, setFormData] = useState({
     description: '',
     amount: '',
@@ -41,21 +49,32 @@ const Transactions = () => {
     }
   }, [loading, user, navigate]);
 
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   useEffect(() => {
     if (user) {
       fetchTransactions();
     }
-  }, [user]);
+  }, [user, debouncedSearch, filterType, filterCategory]);
 
-  useEffect(() => {
-    filterTransactions();
-  }, [transactions, searchTerm, filterType, filterCategory]);
+  const buildParams = (cursor) => {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    if (debouncedSearch) params.search = debouncedSearch;
+    if (filterType !== 'all') params.type = filterType;
+    if (filterCategory !== 'all') params.category = filterCategory;
+    return params;
+  };
 
   const fetchTransactions = async () => {
     try {
       setLoadingData(true);
-      const response = await transactionService.getAllTransactions();
-      setTransactions(response.data);
+      const page = await transactionService.getTransactionsPage(buildParams());
+      setTransactions(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Error fetching transactions:', error);
     } finally {
@@ -63,26 +82,18 @@ const Transactions = () => {
     }
   };
 
-  const filterTransactions = () => {
-    let filtered = transactions;
-
-    if (searchTerm) {
-      filtered = filtered.filter(
-        transaction =>
-          transaction.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          transaction.category.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-
-    if (filterType !== 'all') {
-      filtered = filtered.filter(transaction => transaction.type === filterType);
-    }
-
-    if (filterCategory !== 'all') {
-      filtered = filtered.filter(transaction => transaction.category === filterCategory);
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await transactionService.getTransactionsPage(buildParams(nextCursor));
+      setTransactions(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching transactions:', error);
+    } finally {
+      setLoadingMore(false);
     }
-
-    setFilteredTransactions(filtered);
   };
 
   const toIsoLocalDateTime = (dateString) => {
@@ -149,6 +160,45 @@ const Transactions = () => {
     }
   };
 
+  const handleImport = async (e) => {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) return;
+    try {
+      setImporting(true);
+      setImportMessage('');
+      const { data } = await transactionService.importTransactions(file);
+      const firstError = data.errors[0];
+      setImportMessage(
+        `Imported ${data.inserted} of ${data.rows_read} rows` +
+        (data.failed ? ` (${data.failed} failed${firstError ? `, e.g. line ${firstError.line}: ${firstError.errors[0]}` : ''})` : '')
+      );
+      fetchTransactions();
+    } catch (error) {
+      console.error('Error importing transactions:', error);
+      setImportMessage(error.response?.data?.detail || 'Failed to import transactions');
+    } finally {
+      setImporting(false);
+    }
+  };
+
+  const handleExport = async () => {
+    try {
+      const params = { format: 'csv' };
+      if (filterType !== 'all') params.type = filterType;
+      if (filterCategory !== 'all') params.category = filterCategory;
+      const response = await transactionService.exportTransactions(params);
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = 'transactions.csv';
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error exporting transactions:', error);
+    }
+  };
+
   const openAddModal = () => {
     setEditingTransaction(null);
     setSubmitError('');
@@ -183,15 +233,35 @@ const Transactions = () => {
             Manage your income and expenses
           </p>
         </div>
-        <button
-          onClick={openAddModal}
-          className="flex items-center space-x-2 px-4 py-2 bg-primary-600 text-white rounded-lg hover:bg-primary-700 transition-colors"
-        >
-          <Plus className="w-4 h-4" />
-          <span>Add Transaction</span>
-        </button>
+        <div className="flex items-center space-x-2">
+          <button
+            onClick={handleExport}
+            className="flex items-center space-x-2 px-4 py-2 border rounded-lg text-gray-700 dark:text-gray-300 dark:border-gray-600 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors"
+          >
+            <Download className="w-4 h-4" />
+            <span>Export</span>
+          </button>
+          <label className={`flex items-center space-x-2 px-4 py-2 border rounded-lg cursor-pointer text-gray-700 dark:text-gray-300 dark:border-gray-600 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors ${importing ? 'opacity-50 pointer-events-none' : ''}`}>
+            <Upload className="w-4 h-4" />
+            <span>{importing ? 'Importing...' : 'Import'}</span>
+            <input type="file" accept=".csv,.ndjson,.jsonl" onChange={handleImport} className="hidden" />
+          </label>
+          <button
+            onClick={openAddModal}
+            className="flex items-center space-x-2 px-4 py-2 bg-primary-600 text-white rounded-lg hover:bg-primary-700 transition-colors"
+          >
+            <Plus className="w-4 h-4" />
+            <span>Add Transaction</span>
+          </button>
+        </div>
       </div>
 
+      {importMessage && (
+        <div className="p-4 rounded-lg border bg-white dark:bg-gray-800 dark:border-gray-700 text-sm text-gray-700 dark:text-gray-300">
+          {importMessage}
+        </div>
+      )}
+
       {/* Filters */}
       <div className="p-6 rounded-xl border bg-white dark:bg-gray-800 dark:border-gray-700">
         <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
@@ -241,9 +311,9 @@ const Transactions = () => {
           <div className="flex items-center justify-center h-64">
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-primary-600"></div>
           </div>
-        ) : filteredTransactions.length > 0 ? (
+        ) : transactions.length > 0 ? (
           <div className="space-y-4">
-            {filteredTransactions.map((transaction) => (
+            {transactions.map((transaction) => (
               <div
                 key={transaction.id}
                 className="flex items-center justify-between p-4 rounded-lg border dark:border-gray-700 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors"
@@ -289,6 +359,17 @@ const Transactions = () => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="flex justify-center pt-2">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 border rounded-lg text-gray-700 dark:text-gray-300 dark:border-gray-600 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         ) : (
           <div className="text-center py-12 text-gray-500 dark:text-gray-400">
@@ -25,6 +25,7 @@ export const AuthProvider = ({ children }) => {
           setUser(response.data);
         } catch (error) {
           localStorage.removeItem('token');
+          localStorage.removeItem('refresh_token');
         } finally {
           setLoading(false);
         }
@@ -38,8 +39,9 @@ export const AuthProvider = ({ children }) => {
   const login = async (email, password) => {
     try {
       const response = await authService.login(email, password);
-      const { access_token, token_type } = response.data;
+      const { access_token, refresh_token } = response.data;
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       
       // Fetch user data after login
       const userResponse = await authService.verifyToken();
@@ -60,9 +62,9 @@ export const AuthProvider = ({ children }) => {
       
       // After register, we need to login to get the token
       const loginResponse = await authService.login(email, password);
-      const { access_token, token_type } = loginResponse.data;
-      const token = `${token_type} ${access_token}`;
+      const { access_token, refresh_token } = loginResponse.data;
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       
       setUser(userData);
       return { success: true };
@@ -86,7 +88,7 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
-    localStorage.removeItem('token');
+    authService.logout();
     setUser(null);
   };
 
@@ -19,11 +19,56 @@ api.interceptors.request.use(
   }
 );
 
+let refreshPromise = null;
+
+const NO_REFRESH_PATHS = ['/auth/login', '/auth/refresh', '/auth/logout'];
+
+const refreshTokens = async () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    throw new Error('No refresh token');
+  }
+  let response;
+  try {
+    response = await axios.post(`${API_BASE_URL}/auth/refresh`, {
+      refresh_token: refreshToken,
+    });
+  } catch (error) {
+    // Another tab sharing localStorage may have rotated the token first
+    const latest = localStorage.getItem('token');
+    if (localStorage.getItem('refresh_token') !== refreshToken && latest) {
+      return latest;
+    }
+    throw error;
+  }
+  localStorage.setItem('token', response.data.access_token);
+  localStorage.setItem('refresh_token', response.data.refresh_token);
+  return response.data.access_token;
+};
+
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const originalRequest = error.config;
+    // Only credential exchanges skip the refresh; /auth/me must refresh like any other call
+    const skipsRefresh = NO_REFRESH_PATHS.includes(originalRequest?.url);
+    if (error.response?.status === 401 && originalRequest && !originalRequest._retry && !skipsRefresh) {
+      originalRequest._retry = true;
+      try {
+        // Share one in-flight refresh between concurrent 401s
+        refreshPromise = refreshPromise || refreshTokens().finally(() => {
+          refreshPromise = null;
+        });
+        const accessToken = await refreshPromise;
+        originalRequest.headers.Authorization = `Bearer ${accessToken}`;
+        return api(originalRequest);
+      } catch (refreshError) {
+        // Fall through to a full login below
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
       window.location.href = '/login';
     }
     return Promise.reject(error);
@@ -32,7 +32,16 @@ export const authService = {
     return response;
   },
 
-  logout: () => {
+  logout: async () => {
+    const refreshToken = localStorage.getItem('refresh_token');
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+    if (refreshToken) {
+      try {
+        await api.post('/auth/logout', { refresh_token: refreshToken });
+      } catch (error) {
+        // The local session is already gone; server-side revocation is best effort
+      }
+    }
   },
 };
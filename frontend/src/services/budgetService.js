@@ -6,6 +6,11 @@ export const budgetService = {
     return response;
   },
 
+  getBudgetProgress: async () => {
+    const response = await api.get('/budgets/progress');
+    return response;
+  },
+
   getBudgetById: async (id) => {
     const response = await api.get(`/budgets/${id}`);
     return response;
@@ -0,0 +1,12 @@
+import api from './api';
+
+export const dashboardService = {
+  getDashboard: async ({ country, from, to, windowDays = 30, recentLimit = 5 } = {}) => {
+    const params = { window_days: windowDays, recent_limit: recentLimit };
+    if (country) params.country = country;
+    if (from) params.from = from;
+    if (to) params.to = to;
+    const response = await api.get('/dashboard', { params });
+    return response;
+  },
+};
@@ -6,6 +6,14 @@ export const transactionService = {
     return response;
   },
 
+  getTransactionsPage: async (params = {}) => {
+    const response = await api.get('/transactions', { params });
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
+  },
+
   getTransactionById: async (id) => {
     const response = await api.get(`/transactions/${id}`);
     return response;
@@ -26,6 +34,20 @@ export const transactionService = {
     return response;
   },
 
+  importTransactions: async (file) => {
+    const format = file.name.toLowerCase().endsWith('.csv') ? 'csv' : 'ndjson';
+    const response = await api.post('/transactions/import', file, {
+      params: { format },
+      headers: { 'Content-Type': format === 'csv' ? 'text/csv' : 'application/x-ndjson' },
+    });
+    return response;
+  },
+
+  exportTransactions: async (params = {}) => {
+    const response = await api.get('/transactions/export', { params, responseType: 'blob' });
+    return response;
+  },
+
   getTransactionStats: async (params = {}) => {
     const response = await api.get('/stats/transactions', { params });
     return response;